@@ -1,15 +1,13 @@
 import sys
 from time import sleep, time
 import json
-import requests
-from stem.control import Controller  
 import pygame
 import os
 import threading
 import random  
 import socket
 import queue
-import pyaudio
+from collections import deque
 from datetime import datetime, timedelta
 
 from settings import Settings
@@ -17,22 +15,45 @@ from game_stats import GameStats
 from scoreboard import Scoreboard
 from buttons import Button
 from ship import Ship
-from bullet import Bullet
+from bullet_pool import BulletPool
 from alien import Alien
 from slider import Slider
+from asset_cache import assets
+from text_cache import text_cache
+from renderer import DirtyRectRenderer
+from fleet_engine import VectorFleet
+from rect_collider import RectCollider
+from profiler import FrameProfiler
+from api_client import ApiClient
 
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior."""
 
-    def __init__(self):
-        """Initialize the game, and create game resources."""
-        pygame.init()
+    def __init__(self, headless=False):
+        """Initialize the game, and create game resources.
+
+        A headless game uses SDL's dummy video and audio drivers and skips
+        networking, music and joystick setup, for benchmarks and tests.
+        """
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        # Only what the first frame needs; the mixer, joysticks and network
+        # threads start in _start_background_services once it is drawn.
+        pygame.display.init()
+        pygame.font.init()
         self.clock = pygame.time.Clock()
         self.settings = Settings()
 
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
+        if self.settings.vsync:
+            self.screen = pygame.display.set_mode(
+                (self.settings.screen_width, self.settings.screen_height),
+                pygame.SCALED, vsync=1)
+        else:
+            self.screen = pygame.display.set_mode(
+                (self.settings.screen_width, self.settings.screen_height))
         self.screen_rect = self.screen.get_rect()
         pygame.display.set_caption("Alien Invasion")
 
@@ -46,8 +67,14 @@ class AlienInvasion:
 
         self.ship = Ship(self)
         self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
-        self.opponent_aliens = pygame.sprite.Group()
+        self.bullet_pool = BulletPool(self)
+        self.aliens = pygame.sprite.RenderUpdates()
+        self.opponent_aliens = pygame.sprite.RenderUpdates()
+        self.fleet_engine = None
+        self.previous_positions = {}
+        self.render_alpha = 1.0
+        self.alien_collider = RectCollider(self.settings.collision_list_threshold)
+        self.opponent_collider = RectCollider(self.settings.collision_list_threshold)
 
         self._create_fleet()
 
@@ -56,6 +83,8 @@ class AlienInvasion:
         self.username_input_active = False
         self.game_active = False
         self.level_code_input_active = False
+        self.about_us_active = False
+        self.contact_us_active = False
 
         self.play_button = Button(self, "Play")
         self.start_button = Button(self, "Start Game")
@@ -69,42 +98,53 @@ class AlienInvasion:
         self.achievements_button = Button(self, "Achievements")  # Add Achievements button
         self.about_us_button = Button(self, "About Us")  # Add "About Us" button
         self.contact_us_button = Button(self, "Contact Us")  # Add "Contact Us" button
+        self.login_button = Button(self, "Login")
+        self.register_button = Button(self, "Register")
+        self.registration_back_button = Button(self, "Back")
+        self.report_submit_button = Button(self, "Submit")
+        self.report_back_button = Button(self, "Back")
+        self.about_us_back_button = Button(self, "Back")
+        self.contact_us_back_button = Button(self, "Back")
 
         self.font = pygame.font.SysFont(None, 48)
         self.title_font = pygame.font.SysFont(None, 72)
 
         self.leaderboard_font = pygame.font.SysFont(None, 36)
+        self.form_font = pygame.font.SysFont(None, 36)
+        self.report_topic_font = pygame.font.SysFont(None, 30)
         self.global_leaderboard_data = []
         self.global_leaderboard_images = []
         self.max_leaderboard_entries = 5
 
         try:
-            self.alien_title_image = pygame.image.load('images/alien_title.bmp')
-        except pygame.error as e:
+            self.alien_title_image = assets.get_image('images/alien_title.bmp')
+        except (pygame.error, FileNotFoundError) as e:
             print(f"Error loading title alien image: {e}")
             self.alien_title_image = None
 
+        self._prep_static_text()
         self._initialize_settings_sliders()
         self.server_url = "http://192.168.254.14:5555"  # Updated to connect to the leaderboard server
         self.use_tor = False  
         self.tor_proxy = "socks5h://127.0.0.1:9050"  
+        self.api = ApiClient(self.server_url, proxy=self.tor_proxy if self.use_tor else None)
 
         self.sse_client_running = False
         self.leaderboard_update_pending = False
         self.sse_thread = None
+        self.sse_last_event_id = None
+        self.leaderboard_request = None
 
         self.level_codes = {} 
         self.high_score_mode = False 
 
-        self.chat_messages = [] 
+        self.chat_messages = deque(maxlen=50)
+        self.chat_last_id = None
+        self.chat_room = "global"
         self.chat_input_active = False
         self.chat_user_input = ""
         self.chat_update_pending = False
-        self.chat_thread = threading.Thread(target=self._listen_for_chat_updates, daemon=True)
-        self.chat_thread.start()
-
-        self._load_global_leaderboard()
-        self._start_sse_listener()
+        self.services_started = False
 
         self.penalty_per_alien = 0 
         self.bonus_per_alien = 0  
@@ -112,9 +152,11 @@ class AlienInvasion:
         self.registration_screen_active = False
         self.login_username = ""
         self.login_password = ""
+        self.login_pending = False
         self.registration_username = ""
         self.registration_password = ""
         self.registration_confirm_password = ""
+        self.registration_pending = False
         self.dropdown_active = False
         self.dropdown_rect = None
         self.selected_username = None
@@ -128,6 +170,8 @@ class AlienInvasion:
         self.upgrade_timer = 0  
 
         self.social_score = 0  
+        self.bonus_lives = 0
+        self.is_banned = False
 
         self.is_multiplayer = False
         self.network_thread = None
@@ -194,22 +238,25 @@ class AlienInvasion:
             {"name": "Nebula Background", "image": "images/background_nebula.bmp", "cost": 500, "unlocked": False},
         ]
         self.current_background = self.available_backgrounds[0]  # Default background
-        self.background_image = pygame.image.load(self.current_background["image"])
+
+        assets.preload_skins(self.available_ship_skins)
+        assets.preload_skins(self.available_alien_skins)
+        assets.preload_skins(self.available_backgrounds)
+        self.background_image = self.current_background["surface"]
 
         self.win_music = "sounds/upbeat_music.mp3"
         self.lose_music = "sounds/dramatic_music.mp3"
         self.background_music = "sounds/default_background_music.mp3"
         self.is_admin = False  # Flag to determine if the user is an admin
-        pygame.mixer.init()  # Initialize the mixer for playing sounds
-        self._start_background_music()
-
-        pygame.joystick.init()  # Initialize joystick support
         self.joystick = None
-        self._initialize_joystick()
 
         self.difficulty = "Easy"  # Default difficulty
         self.difficulty_button = Button(self, f"Difficulty: {self.difficulty}")
 
+        self.renderer = DirtyRectRenderer(self)
+        self.profiler = FrameProfiler(self)
+        self.render_mode_button = Button(self, f"Render Mode: {self.settings.render_mode.title()}")
+
     def _initialize_joystick(self):
         """Initialize the first connected joystick."""
         if pygame.joystick.get_count() > 0:
@@ -219,6 +266,115 @@ class AlienInvasion:
         else:
             print("No joystick detected.")
 
+    def _prep_static_text(self):
+        """Render the menu text that never changes once, up front."""
+        self.title_image = self.title_font.render("Alien Invasion", True, self.settings.text_color, self.settings.bg_color)
+        self.leaderboard_title_image = self.font.render("Global Leaderboard", True, self.settings.text_color, self.settings.bg_color)
+        self.github_link_image = self.font.render("Visit www.github.com/bentted", True, (0, 0, 255))  # Blue color for the link
+        self.settings_title_image = self.title_font.render("Settings", True, self.settings.text_color, self.settings.bg_color)
+        self.username_prompt_image = self.font.render("Enter Username (Press Enter to Confirm):", True, self.settings.text_color, self.settings.bg_color)
+
+    def _load_global_leaderboard(self):
+        """Fetch the global leaderboard in the background.
+
+        Returns False if a fetch is already running.
+        """
+        if self.leaderboard_request and not self.leaderboard_request.done():
+            return False
+        self.leaderboard_request = self.api.get(
+            "/api/leaderboard", use_etag=True, on_success=self._prep_global_leaderboard,
+            on_error=lambda e: print(f"Error loading global leaderboard: {e}"))
+        return True
+
+    def _prep_global_leaderboard(self, leaderboard):
+        """Render the downloaded leaderboard entries."""
+        self.global_leaderboard_data = leaderboard[:self.max_leaderboard_entries]
+        self.global_leaderboard_images = [
+            text_cache.render(self.leaderboard_font, f"{rank}. {entry['username']}: {entry['score']}",
+                              self.settings.text_color, self.settings.bg_color)
+            for rank, entry in enumerate(self.global_leaderboard_data, start=1)
+        ]
+        self.renderer.request_full_redraw()
+
+    def _start_sse_listener(self):
+        """Listen for leaderboard and chat updates pushed by the server."""
+        self.sse_client_running = True
+        self.sse_thread = threading.Thread(target=self._listen_for_sse, daemon=True)
+        self.sse_thread.start()
+
+    def _listen_for_sse(self):
+        """Read the server's event stream, reconnecting if it drops."""
+        import requests
+        while self.sse_client_running:
+            # Resume where the last connection left off.
+            headers = {}
+            if self.sse_last_event_id is not None:
+                headers["Last-Event-ID"] = self.sse_last_event_id
+            # Only leaderboard updates and our chat room, not every room's chat.
+            params = {"channels": f"leaderboard,chat:{self.chat_room}"}
+            try:
+                with requests.get(f"{self.server_url}/stream", params=params, headers=headers, stream=True,
+                                  timeout=(5, None)) as response:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not self.sse_client_running:
+                            return
+                        if line and line.startswith("id: "):
+                            self.sse_last_event_id = line[len("id: "):]
+                        elif line and line.startswith("data: "):
+                            self._handle_sse_message(line[len("data: "):])
+            except requests.exceptions.RequestException as e:
+                print(f"SSE connection error: {e}")
+            if self.sse_client_running:
+                sleep(5)
+
+    def _handle_sse_message(self, data):
+        """Flag the main loop to act on a message from the server."""
+        try:
+            message = json.loads(data)
+        except json.JSONDecodeError:
+            return
+        if message.get("type") == "leaderboard_update":
+            self.leaderboard_update_pending = True
+        elif message.get("type") == "chat_message":
+            # This runs on the listener thread; chat state belongs to the main loop.
+            self.api.call_soon(self._add_chat_message, message)
+
+    def _load_chat_history(self):
+        """Load chat messages newer than the last one seen; the rest arrive over SSE."""
+        def loaded(messages):
+            for message in messages:
+                self._add_chat_message(message)
+
+        params = {"room": self.chat_room}
+        if self.chat_last_id:
+            params["since"] = self.chat_last_id
+        self.api.get("/api/chat", params=params, on_success=loaded,
+                     on_error=lambda e: print(f"Error loading chat messages: {e}"))
+
+    def _add_chat_message(self, message):
+        """Keep the last 50 chat messages in id order, like the server does."""
+        message_id = message.get("id")
+        if message_id is None:
+            self.chat_messages.append(message)
+            self.chat_update_pending = True
+            return
+
+        # History and the SSE stream can both deliver a message, in either
+        # order; keep one copy of each, placed by id.
+        if message_id in {kept.get("id") for kept in self.chat_messages}:
+            return
+        index = len(self.chat_messages)
+        while index and self.chat_messages[index - 1].get("id", 0) > message_id:
+            index -= 1
+        if len(self.chat_messages) == self.chat_messages.maxlen:
+            if index == 0:
+                return  # Older than every message kept.
+            self.chat_messages.popleft()
+            index -= 1
+        self.chat_messages.insert(index, message)
+        self.chat_last_id = max(self.chat_last_id or 0, message_id)
+        self.chat_update_pending = True
+
     def _initialize_settings_sliders(self):
         """Create sliders for the settings page."""
         self.settings_sliders = []
@@ -242,14 +398,43 @@ class AlienInvasion:
         self.control_mode = "Keyboard/Mouse"  # Default control mode
         self.control_mode_button = Button(self, f"Control Mode: {self.control_mode}")
 
+    def _start_background_services(self):
+        """Start music, joysticks and networking once the first frame is up."""
+        self.services_started = True
+        self._start_background_music()
+
+        pygame.joystick.init()  # Initialize joystick support
+        self._initialize_joystick()
+
+        self._load_chat_history()
+        self._load_global_leaderboard()
+        self._start_sse_listener()
+
+    def _init_mixer(self):
+        """Initialize the mixer the first time music is played."""
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"Error initializing mixer: {e}")
+                return False
+        return True
+
     def _start_background_music(self):
         """Start playing the background music."""
-        pygame.mixer.music.load(self.background_music)
-        pygame.mixer.music.play(-1)  # Loop the music indefinitely
+        if not self._init_mixer():
+            return
+        try:
+            pygame.mixer.music.load(self.background_music)
+            pygame.mixer.music.play(-1)  # Loop the music indefinitely
+        except pygame.error as e:
+            print(f"Error loading music file: {e}")
 
     def _change_background_music(self, new_music_path):
         """Change the background music (admin only)."""
         if self.is_admin:
+            if not self._init_mixer():
+                return
             try:
                 pygame.mixer.music.load(new_music_path)
                 pygame.mixer.music.play(-1)
@@ -269,27 +454,88 @@ class AlienInvasion:
 
     def run_game(self):
         """Start the main loop for the game."""
+        accumulator = 0.0
         while True:
-            self._check_events()
-
-            if self.leaderboard_update_pending:
-                print("Leaderboard update detected by main loop, refreshing...")
-                self._load_global_leaderboard()
-                self.leaderboard_update_pending = False
-
-            if self.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-
-            self._update_screen()
-            self.clock.tick(60)
+            frame_time = self.clock.tick(self.settings.max_fps) / 1000
+            # Clamp long stalls so the simulation doesn't spiral catching up.
+            accumulator += min(frame_time, self.settings.max_frame_time)
+            self.profiler.start_frame()
+
+            with self.profiler.phase("events"):
+                self._check_events()
+
+            with self.profiler.phase("network"):
+                self.api.process_callbacks()
+                if self.leaderboard_update_pending and self._load_global_leaderboard():
+                    print("Leaderboard update detected by main loop, refreshing...")
+                    self.leaderboard_update_pending = False
+
+            while accumulator >= self.settings.time_step:
+                if self.game_active:
+                    with self.profiler.phase("ship"):
+                        self._snapshot_positions()
+                        self.ship.update()
+                    with self.profiler.phase("bullets"):
+                        self._update_bullets()
+                    with self.profiler.phase("aliens"):
+                        self._update_aliens()
+                accumulator -= self.settings.time_step
+
+            self.render_alpha = accumulator / self.settings.time_step
+            with self.profiler.phase("render"):
+                self._update_screen()
+
+            if not self.services_started and not self.headless:
+                self._start_background_services()
+
+    def _moving_sprites(self):
+        """Yield every sprite the simulation moves."""
+        yield self.ship
+        yield from self.bullets
+        # The vector fleet keeps its own previous positions.
+        if not self.fleet_engine:
+            yield from self.aliens
+        yield from self.opponent_aliens
+
+    def _snapshot_positions(self):
+        """Remember where sprites were before a simulation step."""
+        if self.settings.interpolate_rendering:
+            self.previous_positions = {sprite: sprite.rect.topleft for sprite in self._moving_sprites()}
+            if self.fleet_engine:
+                self.fleet_engine.snapshot()
+
+    def _interpolate_positions(self, alpha):
+        """Draw sprites part way between their last two simulated positions."""
+        if self.fleet_engine:
+            self.fleet_engine.draw_alpha = alpha
+        current_positions = {}
+        for sprite, (previous_x, previous_y) in self.previous_positions.items():
+            x, y = sprite.rect.topleft
+            current_positions[sprite] = (x, y)
+            sprite.rect.topleft = (round(previous_x + (x - previous_x) * alpha),
+                                   round(previous_y + (y - previous_y) * alpha))
+        return current_positions
+
+    def _restore_positions(self, positions):
+        """Put sprites back at their simulated positions after drawing."""
+        if self.fleet_engine:
+            self.fleet_engine.draw_alpha = 1.0
+        for sprite, position in positions.items():
+            sprite.rect.topleft = position
 
     def _check_events(self):
         """Respond to keypresses and mouse events."""
         for event in pygame.event.get():
+            # Menus only change in response to input; during play the
+            # renderer redraws what moved and catches screen changes itself.
+            if self._menu_screen_active() or event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                self.renderer.request_full_redraw()
+
             if event.type == pygame.QUIT:
                 self._save_high_scores()
+                print(self.renderer.frame_time_report())
+                self.profiler.stop_logging()
+                self.api.shutdown()
                 self.sse_client_running = False
                 if self.sse_thread and self.sse_thread.is_alive():
                     try:
@@ -299,6 +545,12 @@ class AlienInvasion:
                 sys.exit()
 
             if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                    continue
+                if event.key == pygame.K_F4:
+                    self.profiler.toggle_logging()
+                    continue
                 if event.key == pygame.K_ESCAPE:
                     if self.settings_page_active:
                         self._apply_slider_settings()
@@ -307,6 +559,9 @@ class AlienInvasion:
                         continue
                     else:
                         self._save_high_scores()
+                        print(self.renderer.frame_time_report())
+                        self.profiler.stop_logging()
+                        self.api.shutdown()
                         self.sse_client_running = False
                         if self.sse_thread and self.sse_thread.is_alive():
                             try:
@@ -417,6 +672,8 @@ class AlienInvasion:
             self._toggle_control_mode()
         elif self.difficulty_button.rect.collidepoint(mouse_pos):
             self._toggle_difficulty()
+        elif self.render_mode_button.rect.collidepoint(mouse_pos):
+            self._toggle_render_mode()
 
     def _toggle_control_mode(self):
         """Toggle between controller and keyboard/mouse controls."""
@@ -438,6 +695,15 @@ class AlienInvasion:
         self.difficulty_button.msg = f"Difficulty: {self.difficulty}"
         self.difficulty_button._prep_msg()
 
+    def _toggle_render_mode(self):
+        """Toggle between full-screen flips and dirty-rect updates."""
+        if self.settings.render_mode == "full":
+            self.settings.render_mode = "dirty"
+        else:
+            self.settings.render_mode = "full"
+        self.render_mode_button._prep_msg(f"Render Mode: {self.settings.render_mode.title()}")
+        self.renderer.request_full_redraw()
+
     def _apply_slider_settings(self):
         """Apply the settings from the sliders."""
         for slider in self.settings_sliders:
@@ -462,32 +728,28 @@ class AlienInvasion:
             self.settings.speedup_scale *= 30
             self.settings.score_scale *= 30
 
-    def _load_user_penalty(self):
-        """Load the penalty score for the current user."""
+    def _load_user_modifiers(self):
+        """Load the current user's penalty, bonus and standing in one request."""
         if not self.username:
             return
-        try:
-            response = requests.get(f"{self.server_url}/api/penalty", params={"username": self.username}, timeout=5)
-            response.raise_for_status()
-            self.penalty_per_alien = response.json().get('penalty', 0)
-            print(f"Penalty for {self.username}: {self.penalty_per_alien} points per alien.")
-        except requests.exceptions.RequestException as e:
-            print(f"Error loading penalty for {self.username}: {e}")
+        username = self.username
+
+        def loaded(data):
+            self.penalty_per_alien = data.get('penalty', 0)
+            self.bonus_per_alien = data.get('bonus', 0)
+            self.social_score = data.get('social_score', 100)
+            self.bonus_lives = data.get('bonus_lives', 0)
+            self.is_banned = data.get('banned', False)
+            print(f"Penalty for {username}: {self.penalty_per_alien} points per alien.")
+            print(f"Bonus for {username}: {self.bonus_per_alien} points per alien.")
+
+        def failed(error):
+            print(f"Error loading modifiers for {username}: {error}")
             self.penalty_per_alien = 0
-
-    def _load_user_bonus(self):
-        """Load the bonus score for the current user."""
-        if not self.username:
-            return
-        try:
-            response = requests.get(f"{self.server_url}/api/bonus", params={"username": self.username}, timeout=5)
-            response.raise_for_status()
-            self.bonus_per_alien = response.json().get('bonus', 0)
-            print(f"Bonus for {self.username}: {self.bonus_per_alien} points per alien.")
-        except requests.exceptions.RequestException as e:
-            print(f"Error loading bonus for {self.username}: {e}")
             self.bonus_per_alien = 0
 
+        self.api.get("/api/user_modifiers", params={"username": username}, on_success=loaded, on_error=failed)
+
     def _handle_username_input(self, event):
         """Handle keypresses during username input."""
         if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
@@ -500,8 +762,7 @@ class AlienInvasion:
                 self.title_screen_active = False
                 self.settings_page_active = False
                 self.game_active = False
-                self._load_user_penalty() 
-                self._load_user_bonus()  
+                self._load_user_modifiers()
         elif event.key == pygame.K_BACKSPACE:
             self.user_input = self.user_input[:-1]
         elif len(self.user_input) < 20:
@@ -517,6 +778,8 @@ class AlienInvasion:
             self._apply_difficulty_settings()  # Apply difficulty settings
 
             self.stats.reset_stats()
+            # A high social score earns extra ships (see _load_user_modifiers).
+            self.stats.ships_left += self.bonus_lives
             self.sb.prep_score()
             self.sb.prep_high_score()
             self.sb.prep_level()
@@ -555,25 +818,32 @@ class AlienInvasion:
                 self.ship.moving_left = False
 
     def _fire_bullet(self):
-        """Create a new bullet and add it to the bullets group."""
+        """Take a bullet from the pool and add it to the bullets group."""
         if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
+            new_bullet = self.bullet_pool.acquire()
+            if new_bullet:
+                # A recycled bullet's snapshot is from its previous flight;
+                # drop it so the bullet isn't drawn part way back there.
+                self.previous_positions.pop(new_bullet, None)
+                self.bullets.add(new_bullet)
 
     def _update_bullets(self):
         """Update position of bullets and get rid of old bullets."""
         self.bullets.update()
 
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        spent_bullets = [bullet for bullet in self.bullets if bullet.rect.bottom <= 0]
+        if spent_bullets:
+            self.bullets.remove(*spent_bullets)
 
         self._check_bullet_alien_collisions()
 
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collisions."""
-        collisions = pygame.sprite.groupcollide(
-            self.bullets, self.aliens, True, True)
+        if self.fleet_engine:
+            collisions = self.fleet_engine.groupcollide(self.bullets)
+        else:
+            collisions = self.alien_collider.groupcollide(
+                self.bullets, self.aliens, True, True)
 
         if collisions:
             for aliens in collisions.values():
@@ -607,6 +877,15 @@ class AlienInvasion:
             print(f"Upgrade granted: {upgrade_type}")
             self._apply_upgrade(upgrade_type)
 
+    def _check_for_chest_drop(self):
+        """Drop a chest with a random upgrade for every chest_drop_threshold points."""
+        if self.stats.score - self.last_chest_drop_score >= self.chest_drop_threshold:
+            self.last_chest_drop_score = self.stats.score
+            self.chests_collected += 1
+            upgrade_type = random.choice(["double_speed", "double_fire_rate", "double_score"])
+            print(f"Chest dropped: {upgrade_type}")
+            self._apply_upgrade(upgrade_type)
+
     def _apply_upgrade(self, upgrade_type):
         """Apply the given upgrade."""
         self.upgrade_active = upgrade_type
@@ -640,7 +919,8 @@ class AlienInvasion:
 
     def _update_screen(self):
         """Update images on the screen, and flip to the new screen."""
-        self.screen.blit(self.background_image, (0, 0))  # Draw the current background
+        if self.background_image:
+            self.screen.blit(self.background_image, (0, 0))  # Draw the current background
 
         if self.title_screen_active:
             self._draw_title_screen()
@@ -797,6 +1077,10 @@ class AlienInvasion:
         self.difficulty_button.rect.centerx = self.screen_rect.centerx
         self.difficulty_button.rect.top = self.control_mode_button.rect.top - 50
         self.difficulty_button.draw_button()
+
+        self.render_mode_button.rect.right = self.screen_rect.right - 30
+        self.render_mode_button.rect.bottom = self.back_button.rect.bottom
+        self.render_mode_button.draw_button()
         
         pygame.mouse.set_visible(True)
 
@@ -884,6 +1168,7 @@ class AlienInvasion:
 
     def _attempt_login(self):
         """Attempt to log in the user."""
+        import requests
         try:
             payload = {"username": self.login_username, "password": self.login_password}
             response = requests.post(f"{self.server_url}/api/login", json=payload, timeout=5)
@@ -970,6 +1255,7 @@ class AlienInvasion:
 
     def _attempt_registration(self):
         """Attempt to register a new user."""
+        import requests
         if self.registration_password != self.registration_confirm_password:
             print("Passwords do not match!")
             return
@@ -1070,6 +1356,7 @@ class AlienInvasion:
 
     def _submit_report(self):
         """Submit the report for the selected user."""
+        import requests
         try:
             payload = {
                 "username": self.selected_username,
@@ -1175,6 +1462,7 @@ class AlienInvasion:
         alien.rect.y = alien_data["y"]
         alien.speed = alien_data["speed"]
         self.opponent_aliens.add(alien)
+        self.opponent_collider.invalidate()
 
     def _update_aliens(self):
         """Update the positions of all aliens."""
@@ -1212,13 +1500,15 @@ class AlienInvasion:
         if winner == "self":
             self.multiplayer_stats["wins"] += 1
             print("You won the multiplayer game!")
-            pygame.mixer.music.load(self.win_music)
-            pygame.mixer.music.play()
+            if self._init_mixer():
+                pygame.mixer.music.load(self.win_music)
+                pygame.mixer.music.play()
         elif winner == "opponent":
             self.multiplayer_stats["losses"] += 1
             print("You lost the multiplayer game!")
-            pygame.mixer.music.load(self.lose_music)
-            pygame.mixer.music.play()
+            if self._init_mixer():
+                pygame.mixer.music.load(self.lose_music)
+                pygame.mixer.music.play()
 
         self.is_multiplayer = False
         if self.client_socket:
@@ -1232,6 +1522,7 @@ class AlienInvasion:
             print("Voice chat is currently disabled for you.")
             return
 
+        import pyaudio
         self.voice_chat_enabled = True
         self.voice_chat_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.audio_stream = pyaudio.PyAudio().open(
@@ -1296,8 +1587,7 @@ class AlienInvasion:
         """Draw the 'About Us' page."""
         self.screen.fill(self.settings.bg_color)
 
-        title_text = "About Us"
-        title_image = self.title_font.render(title_text, True, self.settings.text_color)
+        title_image = text_cache.render(self.title_font, "About Us", self.settings.text_color)
         title_rect = title_image.get_rect()
         title_rect.centerx = self.screen_rect.centerx
         title_rect.top = 50
@@ -1313,18 +1603,16 @@ class AlienInvasion:
         lines = about_text.split("\n")
         y_offset = title_rect.bottom + 30
         for line in lines:
-            line_image = self.font.render(line, True, self.settings.text_color)
+            line_image = text_cache.render(self.font, line, self.settings.text_color)
             line_rect = line_image.get_rect()
             line_rect.centerx = self.screen_rect.centerx
             line_rect.top = y_offset
             self.screen.blit(line_image, line_rect)
             y_offset += 40
 
-        back_button = Button(self, "Back")
-        back_button.rect.centerx = self.screen_rect.centerx
-        back_button.rect.top = y_offset + 50
-        back_button.draw_button()
-        self.about_us_back_button = back_button
+        self.about_us_back_button.rect.centerx = self.screen_rect.centerx
+        self.about_us_back_button.rect.top = y_offset + 50
+        self.about_us_back_button.draw_button()
 
         pygame.mouse.set_visible(True)
 
@@ -1332,15 +1620,14 @@ class AlienInvasion:
         """Draw the 'Contact Us' page."""
         self.screen.fill(self.settings.bg_color)
 
-        title_text = "Contact Us"
-        title_image = self.title_font.render(title_text, True, self.settings.text_color)
+        title_image = text_cache.render(self.title_font, "Contact Us", self.settings.text_color)
         title_rect = title_image.get_rect()
         title_rect.centerx = self.screen_rect.centerx
         title_rect.top = 50
         self.screen.blit(title_image, title_rect)
 
         github_text = "GitHub: github.com/bentted"
-        github_image = self.font.render(github_text, True, (0, 0, 255))  # Blue color for the link
+        github_image = text_cache.render(self.font, github_text, (0, 0, 255))  # Blue color for the link
         github_rect = github_image.get_rect()
         github_rect.centerx = self.screen_rect.centerx
         github_rect.top = title_rect.bottom + 30
@@ -1348,18 +1635,16 @@ class AlienInvasion:
         self.github_link_rect = github_rect  # Save the rect for click detection
 
         tor_text = "Tor Site: http://blkhatjxlrvc5aevqzz5t6kxldayog6jlx5h7glnu44euzongl4fh5ad.onion/index.php-FeuerWasser"
-        tor_image = self.font.render(tor_text, True, (0, 0, 255))  # Blue color for the link
+        tor_image = text_cache.render(self.font, tor_text, (0, 0, 255))  # Blue color for the link
         tor_rect = tor_image.get_rect()
         tor_rect.centerx = self.screen_rect.centerx
         tor_rect.top = github_rect.bottom + 20
         self.screen.blit(tor_image, tor_rect)
         self.tor_link_rect = tor_rect  # Save the rect for click detection
 
-        back_button = Button(self, "Back")
-        back_button.rect.centerx = self.screen_rect.centerx
-        back_button.rect.top = tor_rect.bottom + 50
-        back_button.draw_button()
-        self.contact_us_back_button = back_button
+        self.contact_us_back_button.rect.centerx = self.screen_rect.centerx
+        self.contact_us_back_button.rect.top = tor_rect.bottom + 50
+        self.contact_us_back_button.draw_button()
 
         pygame.mouse.set_visible(True)
 
@@ -1376,8 +1661,38 @@ class AlienInvasion:
             self.title_screen_active = True
 
     def _update_screen(self):
-        """Update images on the screen, and flip to the new screen."""
-        self.screen.blit(self.background_image, (0, 0))  # Draw the current background
+        """Update images on the screen, and push them to the display."""
+        frame_start = time()
+        interpolated_positions = {}
+        if self.settings.interpolate_rendering and self.game_active:
+            interpolated_positions = self._interpolate_positions(self.render_alpha)
+
+        if self.settings.render_mode == "dirty":
+            self.renderer.draw_frame()
+        else:
+            self._draw_full_frame()
+            if self.profiler.overlay_visible:
+                self.profiler.draw_overlay()
+            pygame.display.flip()
+            self.renderer.request_full_redraw()
+
+        self._restore_positions(interpolated_positions)
+        self.renderer.record_frame_time(self.settings.render_mode, time() - frame_start)
+
+        self._update_upgrades() 
+
+    def _menu_screen_active(self):
+        """Return True if a menu page is drawn instead of the bare playfield."""
+        return (self.title_screen_active or self.settings_page_active
+                or self.username_input_active or self.login_screen_active
+                or self.registration_screen_active or self.report_window_active
+                or self.marketplace_active or self.achievements_active
+                or self.about_us_active or self.contact_us_active)
+
+    def _draw_full_frame(self):
+        """Redraw every element of the current screen."""
+        if self.background_image:
+            self.screen.blit(self.background_image, (0, 0))  # Draw the current background
 
         if self.title_screen_active:
             self._draw_title_screen()
@@ -1402,28 +1717,36 @@ class AlienInvasion:
         else:
             self.screen.fill(self.settings.bg_color)
 
+        self._draw_playfield()
+        self.sb.show_score()
+
+    def _draw_playfield(self):
+        """Draw the ship, bullets and aliens, and return the rects drawn.
+
+        Both render modes draw through here, so they layer sprites the same.
+        """
+        drawn_rects = [self.ship.rect.copy()]
         self.ship.blitme()
         for bullet in self.bullets.sprites():
             bullet.draw_bullet()
-        self.aliens.draw(self.screen)
+            drawn_rects.append(bullet.rect.copy())
+        if self.fleet_engine:
+            drawn_rects.append(self.fleet_engine.draw(self.screen))
+        else:
+            self.aliens.draw(self.screen)
+            drawn_rects += [alien.rect.copy() for alien in self.aliens.sprites()]
         self.opponent_aliens.draw(self.screen)
-
-        self.sb.show_score()
-
-        pygame.display.flip()
-
-        self._update_upgrades() 
+        drawn_rects += [alien.rect.copy() for alien in self.opponent_aliens.sprites()]
+        return drawn_rects
 
     def _draw_title_screen(self):
         """Draw the title screen elements."""
         self.screen.fill(self.settings.bg_color)
         
-        title_text = "Alien Invasion"
-        title_image = self.title_font.render(title_text, True, self.settings.text_color, self.settings.bg_color)
-        title_rect = title_image.get_rect()
+        title_rect = self.title_image.get_rect()
         title_rect.centerx = self.screen_rect.centerx
         title_rect.top = 100
-        self.screen.blit(title_image, title_rect)
+        self.screen.blit(self.title_image, title_rect)
 
         if self.alien_title_image:
             alien_rect = self.alien_title_image.get_rect()
@@ -1485,12 +1808,10 @@ class AlienInvasion:
         self.contact_us_button.rect.top = current_top
         self.contact_us_button.draw_button()
 
-        leaderboard_title_text = "Global Leaderboard"
-        leaderboard_title_image = self.font.render(leaderboard_title_text, True, self.settings.text_color, self.settings.bg_color)
-        leaderboard_title_rect = leaderboard_title_image.get_rect()
+        leaderboard_title_rect = self.leaderboard_title_image.get_rect()
         leaderboard_title_rect.centerx = self.screen_rect.centerx
         leaderboard_title_rect.top = self.exit_button.rect.bottom + 40
-        self.screen.blit(leaderboard_title_image, leaderboard_title_rect)
+        self.screen.blit(self.leaderboard_title_image, leaderboard_title_rect)
 
         leaderboard_y_start = leaderboard_title_rect.bottom + 15
         for i, image in enumerate(self.global_leaderboard_images):
@@ -1500,12 +1821,10 @@ class AlienInvasion:
             self.screen.blit(image, image_rect)
 
         # Draw the GitHub link at the bottom of the screen
-        link_text = "Visit www.github.com/bentted"
-        link_image = self.font.render(link_text, True, (0, 0, 255))  # Blue color for the link
-        link_rect = link_image.get_rect()
+        link_rect = self.github_link_image.get_rect()
         link_rect.centerx = self.screen_rect.centerx
         link_rect.bottom = self.screen_rect.bottom - 10
-        self.screen.blit(link_image, link_rect)
+        self.screen.blit(self.github_link_image, link_rect)
         self.github_link_rect = link_rect  # Save the rect for click detection
 
         pygame.mouse.set_visible(True)
@@ -1514,11 +1833,10 @@ class AlienInvasion:
         """Draw the settings page with sliders."""
         self.screen.fill(self.settings.bg_color)
         
-        settings_title_img = self.title_font.render("Settings", True, self.settings.text_color, self.settings.bg_color)
-        settings_title_rect = settings_title_img.get_rect()
+        settings_title_rect = self.settings_title_image.get_rect()
         settings_title_rect.centerx = self.screen_rect.centerx
         settings_title_rect.top = 50
-        self.screen.blit(settings_title_img, settings_title_rect)
+        self.screen.blit(self.settings_title_image, settings_title_rect)
 
         for slider in self.settings_sliders:
             slider.draw()
@@ -1534,14 +1852,17 @@ class AlienInvasion:
         self.difficulty_button.rect.centerx = self.screen_rect.centerx
         self.difficulty_button.rect.top = self.control_mode_button.rect.top - 50
         self.difficulty_button.draw_button()
+
+        self.render_mode_button.rect.right = self.screen_rect.right - 30
+        self.render_mode_button.rect.bottom = self.back_button.rect.bottom
+        self.render_mode_button.draw_button()
         
         pygame.mouse.set_visible(True)
 
     def _draw_username_input(self):
         """Draw the username input field on the screen."""
         self.screen.fill(self.settings.bg_color) 
-        prompt_text = "Enter Username (Press Enter to Confirm):"
-        prompt_image = self.font.render(prompt_text, True, self.settings.text_color, self.settings.bg_color)
+        prompt_image = self.username_prompt_image
         prompt_rect = prompt_image.get_rect()
         prompt_rect.centerx = self.screen_rect.centerx
         prompt_rect.centery = self.screen_rect.centery - 80 
@@ -1555,7 +1876,7 @@ class AlienInvasion:
         pygame.draw.rect(self.screen, (230, 230, 230), self.input_field_rect) 
         pygame.draw.rect(self.screen, (0,0,0), self.input_field_rect, 2) 
 
-        input_text_image = self.font.render(self.user_input, True, (0,0,0), (230,230,230)) 
+        input_text_image = text_cache.render(self.font, self.user_input, (0,0,0), (230,230,230)) 
         input_text_rect = input_text_image.get_rect()
         input_text_rect.left = self.input_field_rect.left + 10 
         input_text_rect.centery = self.input_field_rect.centery
@@ -1568,9 +1889,9 @@ class AlienInvasion:
     def _draw_login_screen(self):
         """Draw the login screen."""
         self.screen.fill(self.settings.bg_color)
-        font = pygame.font.SysFont(None, 36)
+        font = self.form_font
 
-        username_label = font.render("Username:", True, self.settings.text_color)
+        username_label = text_cache.render(font, "Username:", self.settings.text_color)
         username_label_rect = username_label.get_rect()
         username_label_rect.topleft = (100, 150)
         self.screen.blit(username_label, username_label_rect)
@@ -1578,10 +1899,10 @@ class AlienInvasion:
         username_input_rect = pygame.Rect(250, 150, 200, 30)
         pygame.draw.rect(self.screen, (255, 255, 255), username_input_rect)
         pygame.draw.rect(self.screen, (0, 0, 0), username_input_rect, 2)
-        username_text = font.render(self.login_username, True, (0, 0, 0))
+        username_text = text_cache.render(font, self.login_username, (0, 0, 0))
         self.screen.blit(username_text, (username_input_rect.x + 5, username_input_rect.y + 5))
 
-        password_label = font.render("Password:", True, self.settings.text_color)
+        password_label = text_cache.render(font, "Password:", self.settings.text_color)
         password_label_rect = password_label.get_rect()
         password_label_rect.topleft = (100, 200)
         self.screen.blit(password_label, password_label_rect)
@@ -1589,21 +1910,21 @@ class AlienInvasion:
         password_input_rect = pygame.Rect(250, 200, 200, 30)
         pygame.draw.rect(self.screen, (255, 255, 255), password_input_rect)
         pygame.draw.rect(self.screen, (0, 0, 0), password_input_rect, 2)
-        password_text = font.render("*" * len(self.login_password), True, (0, 0, 0))
+        password_text = text_cache.render(font, "*" * len(self.login_password), (0, 0, 0))
         self.screen.blit(password_text, (password_input_rect.x + 5, password_input_rect.y + 5))
 
-        login_button = Button(self, "Login")
-        login_button.rect.topleft = (250, 250)
-        login_button.draw_button()
+        self.login_button.rect.topleft = (250, 250)
+        self.login_button.draw_button()
 
-        register_button = Button(self, "Register")
-        register_button.rect.topleft = (250, 300)
-        register_button.draw_button()
+        self.register_button.rect.topleft = (250, 300)
+        self.register_button.draw_button()
 
         pygame.mouse.set_visible(True)
 
     def _handle_login_input(self, event):
         """Handle input on the login screen."""
+        if event.type != pygame.KEYDOWN:
+            return
         if event.key == pygame.K_TAB:
             pass
         elif event.key == pygame.K_RETURN:
@@ -1620,28 +1941,38 @@ class AlienInvasion:
                 self.login_password += event.unicode
 
     def _attempt_login(self):
-        """Attempt to log in the user."""
-        try:
-            payload = {"username": self.login_username, "password": self.login_password}
-            response = requests.post(f"{self.server_url}/api/login", json=payload, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+        """Send the login details; the screen keeps drawing while we wait."""
+        if self.login_pending:
+            return
+        self.login_pending = True
+        username = self.login_username
+
+        def logged_in(data):
+            self.login_pending = False
             if data.get("success"):
                 print("Login successful!")
-                self.username = self.login_username  
+                self.username = username
+                self.api.set_auth_token(data.get("token"))
                 self.login_screen_active = False
                 self.title_screen_active = True
             else:
                 print("Login failed:", data.get("message"))
-        except requests.exceptions.RequestException as e:
-            print(f"Error during login: {e}")
+
+        def failed(error):
+            self.login_pending = False
+            print(f"Error during login: {error}")
+
+        payload = {"username": username, "password": self.login_password}
+        # A retried login at worst leaves an unused session token behind.
+        self.api.post("/api/login", json=payload, retries=self.api.retries,
+                      on_success=logged_in, on_error=failed)
 
     def _draw_registration_screen(self):
         """Draw the registration screen."""
         self.screen.fill(self.settings.bg_color)
-        font = pygame.font.SysFont(None, 36)
+        font = self.form_font
 
-        username_label = font.render("Username:", True, self.settings.text_color)
+        username_label = text_cache.render(font, "Username:", self.settings.text_color)
         username_label_rect = username_label.get_rect()
         username_label_rect.topleft = (100, 150)
         self.screen.blit(username_label, username_label_rect)
@@ -1649,10 +1980,10 @@ class AlienInvasion:
         username_input_rect = pygame.Rect(250, 150, 200, 30)
         pygame.draw.rect(self.screen, (255, 255, 255), username_input_rect)
         pygame.draw.rect(self.screen, (0, 0, 0), username_input_rect, 2)
-        username_text = font.render(self.registration_username, True, (0, 0, 0))
+        username_text = text_cache.render(font, self.registration_username, (0, 0, 0))
         self.screen.blit(username_text, (username_input_rect.x + 5, username_input_rect.y + 5))
 
-        password_label = font.render("Password:", True, self.settings.text_color)
+        password_label = text_cache.render(font, "Password:", self.settings.text_color)
         password_label_rect = password_label.get_rect()
         password_label_rect.topleft = (100, 200)
         self.screen.blit(password_label, password_label_rect)
@@ -1660,10 +1991,10 @@ class AlienInvasion:
         password_input_rect = pygame.Rect(250, 200, 200, 30)
         pygame.draw.rect(self.screen, (255, 255, 255), password_input_rect)
         pygame.draw.rect(self.screen, (0, 0, 0), password_input_rect, 2)
-        password_text = font.render("*" * len(self.registration_password), True, (0, 0, 0))
+        password_text = text_cache.render(font, "*" * len(self.registration_password), (0, 0, 0))
         self.screen.blit(password_text, (password_input_rect.x + 5, password_input_rect.y + 5))
 
-        confirm_password_label = font.render("Confirm Password:", True, self.settings.text_color)
+        confirm_password_label = text_cache.render(font, "Confirm Password:", self.settings.text_color)
         confirm_password_label_rect = confirm_password_label.get_rect()
         confirm_password_label_rect.topleft = (100, 250)
         self.screen.blit(confirm_password_label, confirm_password_label_rect)
@@ -1671,21 +2002,21 @@ class AlienInvasion:
         confirm_password_input_rect = pygame.Rect(250, 250, 200, 30)
         pygame.draw.rect(self.screen, (255, 255, 255), confirm_password_input_rect)
         pygame.draw.rect(self.screen, (0, 0, 0), confirm_password_input_rect, 2)
-        confirm_password_text = font.render("*" * len(self.registration_confirm_password), True, (0, 0, 0))
+        confirm_password_text = text_cache.render(font, "*" * len(self.registration_confirm_password), (0, 0, 0))
         self.screen.blit(confirm_password_text, (confirm_password_input_rect.x + 5, confirm_password_input_rect.y + 5))
 
-        register_button = Button(self, "Register")
-        register_button.rect.topleft = (250, 300)
-        register_button.draw_button()
+        self.register_button.rect.topleft = (250, 300)
+        self.register_button.draw_button()
 
-        back_button = Button(self, "Back")
-        back_button.rect.topleft = (250, 350)
-        back_button.draw_button()
+        self.registration_back_button.rect.topleft = (250, 350)
+        self.registration_back_button.draw_button()
 
         pygame.mouse.set_visible(True)
 
     def _handle_registration_input(self, event):
         """Handle input on the registration screen."""
+        if event.type != pygame.KEYDOWN:
+            return
         if event.key == pygame.K_TAB:
             pass
         elif event.key == pygame.K_RETURN:
@@ -1706,43 +2037,48 @@ class AlienInvasion:
                 self.registration_confirm_password += event.unicode
 
     def _attempt_registration(self):
-        """Attempt to register a new user."""
+        """Send the registration details without blocking the game loop."""
+        if self.registration_pending:
+            return
         if self.registration_password != self.registration_confirm_password:
             print("Passwords do not match!")
             return
+        self.registration_pending = True
 
-        try:
-            payload = {"username": self.registration_username, "password": self.registration_password}
-            response = requests.post(f"{self.server_url}/api/register", json=payload, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+        def registered(data):
+            self.registration_pending = False
             if data.get("success"):
                 print("Registration successful! You can now log in.")
                 self.registration_screen_active = False
                 self.login_screen_active = True
             else:
                 print("Registration failed:", data.get("message"))
-        except requests.exceptions.RequestException as e:
-                       print(f"Error during registration: {e}")
+
+        def failed(error):
+            self.registration_pending = False
+            print(f"Error during registration: {error}")
+
+        payload = {"username": self.registration_username, "password": self.registration_password}
+        self.api.post("/api/register", json=payload, on_success=registered, on_error=failed)
 
     def _draw_report_window(self):
         """Draw the report window."""
         if self.report_window_active:
             self.screen.fill(self.settings.bg_color)
-            font = pygame.font.SysFont(None, 36)
+            font = self.form_font
 
             title_text = f"Report User: {self.selected_username}"
-            title_image = font.render(title_text, True, self.settings.text_color)
+            title_image = text_cache.render(font, title_text, self.settings.text_color)
             title_rect = title_image.get_rect()
             title_rect.centerx = self.screen_rect.centerx
             title_rect.top = 50
             self.screen.blit(title_image, title_rect)
 
-            topic_font = pygame.font.SysFont(None, 30)
+            topic_font = self.report_topic_font
             y_offset = 150
             self.report_topic_rects = []
             for topic in self.report_topics:
-                topic_image = topic_font.render(topic, True, self.settings.text_color)
+                topic_image = text_cache.render(topic_font, topic, self.settings.text_color)
                 topic_rect = topic_image.get_rect()
                 topic_rect.centerx = self.screen_rect.centerx
                 topic_rect.top = y_offset
@@ -1751,7 +2087,7 @@ class AlienInvasion:
                 y_offset += 40
 
             if self.selected_report_topic:
-                details_label = font.render("Details (optional):", True, self.settings.text_color)
+                details_label = text_cache.render(font, "Details (optional):", self.settings.text_color)
                 details_label_rect = details_label.get_rect()
                 details_label_rect.topleft = (50, y_offset + 20)
                 self.screen.blit(details_label, details_label_rect)
@@ -1760,18 +2096,16 @@ class AlienInvasion:
                 pygame.draw.rect(self.screen, (255, 255, 255), input_box_rect)
                 pygame.draw.rect(self.screen, (0, 0, 0), input_box_rect, 2)
 
-                input_text_image = font.render(self.report_details_input, True, (0, 0, 0))
+                input_text_image = text_cache.render(font, self.report_details_input, (0, 0, 0))
                 self.screen.blit(input_text_image, (input_box_rect.left + 5, input_box_rect.top + 5))
 
-                submit_button = Button(self, "Submit")
-                submit_button.rect.centerx = self.screen_rect.centerx
-                submit_button.rect.top = y_offset + 120
-                submit_button.draw_button()
+                self.report_submit_button.rect.centerx = self.screen_rect.centerx
+                self.report_submit_button.rect.top = y_offset + 120
+                self.report_submit_button.draw_button()
 
-            back_button = Button(self, "Back")
-            back_button.rect.centerx = self.screen_rect.centerx
-            back_button.rect.top = y_offset + 180
-            back_button.draw_button()
+            self.report_back_button.rect.centerx = self.screen_rect.centerx
+            self.report_back_button.rect.top = y_offset + 180
+            self.report_back_button.draw_button()
 
     def _handle_report_window_click(self, mouse_pos):
         """Handle clicks in the report window."""
@@ -1806,20 +2140,18 @@ class AlienInvasion:
                 self.report_details_input += event.unicode
 
     def _submit_report(self):
-        """Submit the report for the selected user."""
-        try:
-            payload = {
-                "username": self.selected_username,
-                "type": "negative",
-                "reporter": self.username,
-                "reason": self.selected_report_topic,
-                "details": self.report_details_input, 
-            }
-            response = requests.post(f"{self.server_url}/api/chat/report", json=payload, timeout=5)
-            response.raise_for_status()
-            print(f"Reported user {self.selected_username}: {response.json().get('message')}")
-        except requests.exceptions.RequestException as e:
-            print(f"Error reporting user {self.selected_username}: {e}")
+        """Submit the report for the selected user in the background."""
+        reported = self.selected_username
+        payload = {
+            "username": reported,
+            "type": "negative",
+            "reporter": self.username,
+            "reason": self.selected_report_topic,
+            "details": self.report_details_input, 
+        }
+        self.api.post("/api/chat/report", json=payload,
+                      on_success=lambda data: print(f"Reported user {reported}: {data.get('message')}"),
+                      on_error=lambda e: print(f"Error reporting user {reported}: {e}"))
 
     def _start_multiplayer(self, is_host):
         """Start multiplayer mode."""
@@ -1912,17 +2244,151 @@ class AlienInvasion:
         alien.rect.y = alien_data["y"]
         alien.speed = alien_data["speed"]
         self.opponent_aliens.add(alien)
+        self.opponent_collider.invalidate()
 
     def _update_aliens(self):
         """Update the positions of all aliens."""
-        self.aliens.update()
+        if self.fleet_engine:
+            self.fleet_engine.update()
+        else:
+            self._check_fleet_edges()
+            self.aliens.update()
         self.opponent_aliens.update()
 
-        if pygame.sprite.spritecollideany(self.ship, self.aliens) or pygame.sprite.spritecollideany(self.ship, self.opponent_aliens):
+        if self.fleet_engine:
+            ship_hit = self.fleet_engine.collideany(self.ship.rect)
+        else:
+            ship_hit = self.alien_collider.spritecollideany(self.ship, self.aliens)
+        if ship_hit or self.opponent_collider.spritecollideany(self.ship, self.opponent_aliens):
             self._ship_hit()
 
         self._check_aliens_bottom()
 
+    def _ship_hit(self):
+        """Respond to the ship being hit by an alien."""
+        if self.stats.ships_left > 0:
+            self.stats.ships_left -= 1
+            self.sb.prep_ships()
+
+            self.bullets.empty()
+            self.aliens.empty()
+
+            self._create_fleet()
+            self.ship.center_ship()
+
+            if not self.headless:
+                sleep(0.5)
+            # Don't count the pause as time the simulation has to catch up on.
+            self.clock.tick()
+        else:
+            self.game_active = False
+            pygame.mouse.set_visible(True)
+            # The server has banned this player from the leaderboard, so
+            # their scores aren't recorded here either.
+            if self.username and not self.is_banned:
+                current_high_score = self.high_scores.get(self.username, 0)
+                if self.stats.score > current_high_score:
+                    self.high_scores[self.username] = self.stats.score
+                if self.stats.score > self.stats.high_score:
+                    self.stats.high_score = self.stats.score
+                    self.sb.prep_high_score()
+
+            self.user_input = ""
+            self.title_screen_active = True
+            self.username_input_active = False
+
+    def _create_fleet(self):
+        """Create the fleet of aliens, or a swarm if one is configured."""
+        use_vector = self.settings.fleet_engine == "vector" and VectorFleet.available()
+        if use_vector and self.settings.swarm_size:
+            self._create_swarm(self.settings.swarm_size)
+        else:
+            # Spacing between aliens is one alien width and one alien height.
+            alien = Alien(self)
+            alien_width, alien_height = alien.rect.size
+
+            current_x, current_y = alien_width, alien_height
+            while current_y < (self.settings.screen_height - 3 * alien_height):
+                while current_x < (self.settings.screen_width - 2 * alien_width):
+                    self._create_alien(current_x, current_y)
+                    current_x += 2 * alien_width
+
+                current_x = alien_width
+                current_y += 2 * alien_height
+
+        if use_vector:
+            self.fleet_engine = VectorFleet(self)
+            self.fleet_engine.build(self.aliens)
+        else:
+            self.fleet_engine = None
+        self.alien_collider.invalidate()
+        self.previous_positions = {}
+
+    def _create_swarm(self, count):
+        """Pack count aliens into the upper part of the screen, overlapping as needed."""
+        alien = Alien(self)
+        alien_width, alien_height = alien.rect.size
+
+        area_width = self.settings.screen_width - 3 * alien_width
+        area_height = self.settings.screen_height - 4 * alien_height
+        columns = max(1, int((count * area_width / area_height) ** 0.5))
+        rows = -(-count // columns)
+        step_x = area_width / columns
+        step_y = area_height / rows
+
+        for index in range(count):
+            row, column = divmod(index, columns)
+            self._create_alien(int(alien_width + column * step_x), int(alien_height + row * step_y))
+
+    def _create_alien(self, x_position, y_position):
+        """Create an alien and place it in the fleet."""
+        new_alien = Alien(self)
+        new_alien.x = x_position
+        new_alien.rect.x = x_position
+        new_alien.rect.y = y_position
+        self.aliens.add(new_alien)
+
+    def _check_fleet_edges(self):
+        """Respond appropriately if any aliens have reached an edge."""
+        for alien in self.aliens.sprites():
+            if alien.check_edges():
+                self._change_fleet_direction()
+                break
+
+    def _change_fleet_direction(self):
+        """Drop the entire fleet and change the fleet's direction."""
+        for alien in self.aliens.sprites():
+            alien.rect.y += self.settings.fleet_drop_speed
+        self.settings.fleet_direction *= -1
+
+    def _check_aliens_bottom(self):
+        """Check if any aliens have reached the bottom of the screen."""
+        if self.fleet_engine:
+            if self.fleet_engine.reached_bottom():
+                self._ship_hit()
+            return
+
+        for alien in self.aliens.sprites():
+            if alien.rect.bottom >= self.screen_rect.bottom:
+                # Treat this the same as if the ship got hit.
+                self._ship_hit()
+                break
+
+    def _save_high_scores(self):
+        """Save high scores to a file."""
+        with open('high_scores.json', 'w') as f:
+            json.dump(self.high_scores, f)
+
+    def _load_high_scores(self):
+        """Load high scores from a file."""
+        try:
+            with open('high_scores.json') as f:
+                self.high_scores = json.load(f)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            self.high_scores = {}
+
     def _check_multiplayer_game_over(self):
         """Check if the multiplayer game is over."""
         if self.stats.ships_left <= 0:
@@ -1949,13 +2415,15 @@ class AlienInvasion:
         if winner == "self":
             self.multiplayer_stats["wins"] += 1
             print("You won the multiplayer game!")
-            pygame.mixer.music.load(self.win_music)
-            pygame.mixer.music.play()
+            if self._init_mixer():
+                pygame.mixer.music.load(self.win_music)
+                pygame.mixer.music.play()
         elif winner == "opponent":
             self.multiplayer_stats["losses"] += 1
             print("You lost the multiplayer game!")
-            pygame.mixer.music.load(self.lose_music)
-            pygame.mixer.music.play()
+            if self._init_mixer():
+                pygame.mixer.music.load(self.lose_music)
+                pygame.mixer.music.play()
 
         self.is_multiplayer = False
         if self.client_socket:
@@ -1969,6 +2437,7 @@ class AlienInvasion:
             print("Voice chat is currently disabled for you.")
             return
 
+        import pyaudio
         self.voice_chat_enabled = True
         self.voice_chat_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.audio_stream = pyaudio.PyAudio().open(
@@ -2028,3 +2497,9 @@ class AlienInvasion:
             print(f"Voice chat is disabled for {username} until {self.kick_list[username]}.")
             return False
         return True
+
+
+if __name__ == '__main__':
+    # Make a game instance, and run the game.
+    ai = AlienInvasion()
+    ai.run_game()
@@ -1,6 +1,8 @@
 import pygame
 from pygame.sprite import Sprite
 
+from asset_cache import assets
+
 
 class Alien(Sprite):
     """A class to represent a single alien in the fleet."""
@@ -11,7 +13,7 @@ class Alien(Sprite):
         self.screen = ai_game.screen
         self.settings = ai_game.settings
 
-        self.image = pygame.image.load('images/alien.bmp')
+        self.image = assets.get_image('images/alien.bmp')
         self.rect = self.image.get_rect()
 
         self.rect.x = self.rect.width
@@ -0,0 +1,136 @@
+import json
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import sleep
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+RETRY_STATUS_CODES = {502, 503, 504}
+
+
+class ApiClient:
+    """A class to call the leaderboard server without blocking the game loop.
+
+    Requests run on a small worker pool sharing one keep-alive session.
+    Callbacks are queued and only run when the main loop calls
+    process_callbacks(), so they can safely touch game state.
+    """
+
+    def __init__(self, base_url, max_workers=4, timeout=5, retries=2, backoff=0.5, proxy=None):
+        """Initialize the worker pool; the session is created on first use."""
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.proxy = proxy
+        self.max_workers = max_workers
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        self.completed = queue.SimpleQueue()
+        self.etag_cache = {}
+        self.auth_token = None
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Return the shared session, creating it the first time."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if self.proxy:
+                    session.proxies = {"http": self.proxy, "https": self.proxy}
+                self._session = session
+            return self._session
+
+    def set_auth_token(self, token):
+        """Send token as a Bearer credential on every later request; None stops."""
+        self.auth_token = token
+
+    def get(self, path, on_success=None, on_error=None, **kwargs):
+        """Send a GET request in the background and return its future."""
+        return self.request("GET", path, on_success, on_error, **kwargs)
+
+    def post(self, path, on_success=None, on_error=None, **kwargs):
+        """Send a POST request in the background and return its future."""
+        return self.request("POST", path, on_success, on_error, **kwargs)
+
+    def request(self, method, path, on_success=None, on_error=None, retries=None, use_etag=False, **kwargs):
+        """Queue a request; its decoded JSON or exception goes to the callbacks.
+
+        Only idempotent methods are retried unless retries is given. With
+        use_etag, the last response is revalidated with If-None-Match and
+        reused when the server answers 304 Not Modified.
+        """
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        future = self.executor.submit(self._send, method, path, retries, use_etag, kwargs)
+        if on_success or on_error:
+            future.add_done_callback(lambda done: self.completed.put((done, on_success, on_error)))
+        return future
+
+    def _send(self, method, path, retries, use_etag, kwargs):
+        """Make the request on a worker thread, backing off between retries."""
+        import requests
+        kwargs.setdefault("timeout", self.timeout)
+        auth_token = self.auth_token
+        if auth_token:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": f"Bearer {auth_token}"}
+        cache_key = (method, path, json.dumps(kwargs.get("params"), sort_keys=True))
+        cached = self.etag_cache.get(cache_key) if use_etag else None
+        if cached:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": cached[0]}
+
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+                if response.status_code == 401 and auth_token and self.auth_token == auth_token:
+                    # The session expired or was revoked; stop sending it
+                    # unless a new token was set in the meantime.
+                    self.auth_token = None
+                if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                    if cached and response.status_code == 304:
+                        return cached[1]
+                    response.raise_for_status()
+                    data = response.json()
+                    if use_etag and response.headers.get("ETag"):
+                        self.etag_cache[cache_key] = (response.headers["ETag"], data)
+                    return data
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == retries:
+                    raise
+            sleep(self.backoff * 2 ** attempt)
+
+    def call_soon(self, callback, value):
+        """Pass value to callback on the next process_callbacks(); safe from any thread."""
+        future = Future()
+        future.set_result(value)
+        self.completed.put((future, callback, None))
+
+    def process_callbacks(self):
+        """Run the callbacks of every finished request; call from the main loop."""
+        while True:
+            try:
+                future, on_success, on_error = self.completed.get_nowait()
+            except queue.Empty:
+                return
+            error = future.exception()
+            if error is None:
+                if on_success:
+                    on_success(future.result())
+            elif on_error:
+                on_error(error)
+
+    def pending(self):
+        """Return how many finished requests are waiting for the main loop."""
+        return self.completed.qsize()
+
+    def shutdown(self):
+        """Stop the workers, dropping requests that haven't started."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
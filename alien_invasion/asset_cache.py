@@ -0,0 +1,38 @@
+import pygame
+
+
+class AssetCache:
+    """A class to load each image once and share it across the game."""
+
+    def __init__(self):
+        """Initialize the cache storage."""
+        self.images = {}
+
+    def get_image(self, path, alpha=False):
+        """Return the shared surface for path, loading it on first use."""
+        key = (path, alpha)
+        image = self.images.get(key)
+        if image is None:
+            image = pygame.image.load(path)
+            # Match the display format so blits don't convert every frame.
+            if pygame.display.get_surface():
+                image = image.convert_alpha() if alpha else image.convert()
+            self.images[key] = image
+        return image
+
+    def preload_skins(self, skins):
+        """Attach a shared surface to each skin entry that has an image."""
+        for skin in skins:
+            try:
+                skin["surface"] = self.get_image(skin["image"])
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Error loading skin image {skin['image']}: {e}")
+                skin["surface"] = None
+
+    def clear(self):
+        """Drop every cached surface."""
+        self.images.clear()
+
+
+# Shared by every sprite so fleets and scoreboards reuse the same surfaces.
+assets = AssetCache()
@@ -0,0 +1,220 @@
+"""Run Alien Invasion headless and time each phase of the game loop.
+
+Examples:
+    python benchmark.py
+    python benchmark.py --scenario swarm --frames 2000
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json --tolerance 0.15
+    python benchmark.py --collisions
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from time import perf_counter
+
+import pygame
+
+from Alien_Invasion import AlienInvasion
+from rect_collider import RectCollider
+
+
+PHASES = ["_check_events", "ship.update", "_update_bullets", "_update_aliens", "_update_screen"]
+
+SCENARIOS = {
+    "default": {"render_mode": "full", "fleet_engine": "sprite", "swarm_size": 0},
+    "dirty": {"render_mode": "dirty", "fleet_engine": "sprite", "swarm_size": 0},
+    "swarm": {"render_mode": "dirty", "fleet_engine": "vector", "swarm_size": 2000},
+}
+
+COLLISION_SIZES = [16, 64, 250, 1000, 2000]
+
+
+def post_scripted_input(frame):
+    """Queue the keypresses a player would make on this frame."""
+    # Sweep back and forth across the screen, firing every few frames.
+    # Gameplay keys don't force a full redraw, so the dirty scenario keeps
+    # measuring dirty-rect frames.
+    if frame % 120 == 0:
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_LEFT))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT))
+    elif frame % 120 == 60:
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_RIGHT))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT))
+    if frame % 5 == 0:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+
+
+def start_game(scenario, seed):
+    """Create a headless game already in play for the given scenario."""
+    random.seed(seed)
+    ai = AlienInvasion(headless=True)
+    ai.settings.render_mode = scenario["render_mode"]
+    ai.settings.fleet_engine = scenario["fleet_engine"]
+    ai.settings.swarm_size = scenario["swarm_size"]
+
+    ai.username = "benchmark"
+    ai.title_screen_active = False
+    ai.login_screen_active = False
+    ai.game_active = True
+
+    ai.aliens.empty()
+    ai._create_fleet()
+    return ai
+
+
+def run_scenario(scenario, frames, seed):
+    """Simulate frames of scripted play and return per-phase timings."""
+    ai = start_game(scenario, seed)
+    steps = [
+        ("_check_events", ai._check_events),
+        ("ship.update", ai.ship.update),
+        ("_update_bullets", ai._update_bullets),
+        ("_update_aliens", ai._update_aliens),
+        ("_update_screen", ai._update_screen),
+    ]
+    timings = {phase: [] for phase in PHASES}
+
+    for frame in range(frames):
+        # Keep playing no matter how often the ship is hit.
+        ai.stats.ships_left = ai.settings.ship_limit
+        post_scripted_input(frame)
+        for phase, step in steps:
+            start = perf_counter()
+            step()
+            timings[phase].append(perf_counter() - start)
+
+    summary = summarize(timings)
+    summary["frame"]["full_redraws"] = ai.renderer.full_redraw_count
+    return summary
+
+
+def summarize(timings):
+    """Reduce raw phase timings to millisecond statistics."""
+    summary = {}
+    for phase, samples in timings.items():
+        ordered = sorted(samples)
+        summary[phase] = {
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "median_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[int(len(ordered) * 0.95)] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+    summary["frame"] = {"mean_ms": sum(stats["mean_ms"] for stats in summary.values())}
+    return summary
+
+
+def print_results(results):
+    """Print a table of phase timings for each scenario."""
+    for name, summary in results.items():
+        frame = summary["frame"]
+        print(f"\n{name}: {frame['mean_ms']:.3f} ms per frame")
+        if name in SCENARIOS and SCENARIOS[name]["render_mode"] == "dirty":
+            print(f"  full redraws: {frame.get('full_redraws', 0)}")
+        print(f"  {'phase':<18}{'mean':>10}{'median':>10}{'p95':>10}{'max':>10}")
+        for phase in PHASES:
+            stats = summary[phase]
+            print(f"  {phase:<18}{stats['mean_ms']:>10.3f}{stats['median_ms']:>10.3f}"
+                  f"{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+
+
+def run_collisions(sizes, repeats, seed):
+    """Time one step's collision checks with pygame's functions and RectCollider."""
+    random.seed(seed)
+    results = {}
+    for size in sizes:
+        aliens = pygame.sprite.Group()
+        for _ in range(size):
+            alien = pygame.sprite.Sprite()
+            alien.rect = pygame.Rect(random.randrange(1140), random.randrange(740), 60, 58)
+            aliens.add(alien)
+        bullets = pygame.sprite.Group()
+        for _ in range(3):
+            bullet = pygame.sprite.Sprite()
+            bullet.rect = pygame.Rect(random.randrange(1200), random.randrange(800), 3, 15)
+            bullets.add(bullet)
+        ship = pygame.sprite.Sprite()
+        ship.rect = pygame.Rect(570, 752, 60, 48)
+
+        # A threshold of 0 always uses the rect list, to show where it pays off.
+        collider = RectCollider(threshold=0)
+        checks = {
+            "pygame": lambda: (pygame.sprite.groupcollide(bullets, aliens, False, False),
+                               pygame.sprite.spritecollideany(ship, aliens)),
+            "rect list": lambda: (collider.groupcollide(bullets, aliens, False, False),
+                                  collider.spritecollideany(ship, aliens)),
+        }
+        results[size] = {}
+        for name, check in checks.items():
+            start = perf_counter()
+            for _ in range(repeats):
+                check()
+            results[size][name] = (perf_counter() - start) / repeats * 1000
+    return results
+
+
+def print_collisions(results):
+    """Print collision timings for each group size."""
+    print(f"\n  {'aliens':<10}{'pygame':>12}{'rect list':>12}{'speedup':>10}")
+    for size, timings in results.items():
+        speedup = timings["pygame"] / timings["rect list"]
+        print(f"  {size:<10}{timings['pygame']:>10.3f}ms{timings['rect list']:>10.3f}ms{speedup:>9.2f}x")
+
+
+def find_regressions(results, baseline, tolerance):
+    """Return descriptions of mean phase times that grew past tolerance."""
+    regressions = []
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        for phase in PHASES + ["frame"]:
+            old = baseline[name][phase]["mean_ms"]
+            new = summary[phase]["mean_ms"]
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{name} {phase}: {old:.3f} ms -> {new:.3f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Alien Invasion game loop.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS) + ["all"], default="all")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed slowdown before a phase counts as a regression")
+    parser.add_argument("--collisions", action="store_true",
+                        help="compare collision checks against pygame's instead of running the game")
+    args = parser.parse_args()
+
+    if args.collisions:
+        print_collisions(run_collisions(COLLISION_SIZES, args.frames, args.seed))
+        return
+
+    # Images are loaded relative to the game directory.
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    names = sorted(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    results = {name: run_scenario(SCENARIOS[name], args.frames, args.seed) for name in names}
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == '__main__':
+    main()
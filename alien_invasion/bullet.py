@@ -9,11 +9,20 @@ class Bullet(Sprite):
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
+        self.ship = ai_game.ship
         self.color = self.settings.bullet_color
 
         self.rect = pygame.Rect(0, 0, self.settings.bullet_width,
             self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.rect.midtop = self.ship.rect.midtop
+
+        self.y = float(self.rect.y)
+
+    def reset(self):
+        """Move a recycled bullet back to the ship's current position."""
+        self.color = self.settings.bullet_color
+        self.rect.size = (self.settings.bullet_width, self.settings.bullet_height)
+        self.rect.midtop = self.ship.rect.midtop
 
         self.y = float(self.rect.y)
 
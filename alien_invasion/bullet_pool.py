@@ -0,0 +1,36 @@
+from bullet import Bullet
+
+
+class BulletPool:
+    """A class to recycle a fixed set of bullets instead of allocating new ones."""
+
+    def __init__(self, ai_game):
+        """Create enough bullets for the current bullets_allowed setting."""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.bullets = []
+        self._resize()
+
+    def _resize(self):
+        """Grow or shrink the pool to match Settings.bullets_allowed."""
+        capacity = self.settings.bullets_allowed
+        while len(self.bullets) < capacity:
+            self.bullets.append(Bullet(self.ai_game))
+
+        if len(self.bullets) > capacity:
+            # Never drop a bullet that is still on screen.
+            in_flight = [bullet for bullet in self.bullets if bullet.alive()]
+            free = [bullet for bullet in self.bullets if not bullet.alive()]
+            self.bullets = in_flight + free[:max(0, capacity - len(in_flight))]
+
+    def acquire(self):
+        """Return a free bullet reset to the ship, or None if all are in use."""
+        if len(self.bullets) != self.settings.bullets_allowed:
+            self._resize()
+
+        # A bullet is free once it has left every group.
+        for bullet in self.bullets:
+            if not bullet.alive():
+                bullet.reset()
+                return bullet
+        return None
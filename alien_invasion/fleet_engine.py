@@ -0,0 +1,133 @@
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the sprite fleet is used without it.
+    np = None
+
+
+class VectorFleet:
+    """A class to move, collide and draw a whole fleet of aliens with NumPy.
+
+    Positions live in the arrays, not in the sprites' rects; a sprite's
+    rect is only brought up to date when that alien is shot down, so
+    per-step work never loops over the fleet in Python.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize empty position arrays for the fleet."""
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+
+        self.sprites = []
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        self.width = 0
+        self.height = 0
+
+        # Positions before the last step, for drawing part way between steps.
+        self.previous = None
+        self.draw_alpha = 1.0
+
+    @staticmethod
+    def available():
+        """Return True if NumPy could be imported."""
+        return np is not None
+
+    def build(self, aliens):
+        """Copy the positions of the given alien sprites into the arrays."""
+        self.sprites = list(aliens)
+        self.x = np.array([alien.x for alien in self.sprites], dtype=float)
+        self.y = np.array([alien.rect.y for alien in self.sprites], dtype=float)
+        self.alive = np.ones(len(self.sprites), dtype=bool)
+        if self.sprites:
+            self.width, self.height = self.sprites[0].rect.size
+        self.previous = None
+
+    def update(self):
+        """Drop the fleet if it touched an edge, then move it sideways."""
+        if not self.alive.any():
+            return
+
+        # Match the sprite path, which compares the truncated rect positions.
+        left = np.trunc(self.x[self.alive])
+        if left.max() + self.width >= self.screen_rect.right or left.min() <= 0:
+            self.y += self.settings.fleet_drop_speed
+            self.settings.fleet_direction *= -1
+
+        self.x += self.settings.alien_speed * self.settings.fleet_direction
+
+    def _rect_positions(self):
+        """Return the integer left and top of every alien, as its rect would have."""
+        return self.x.astype(int), self.y.astype(int)
+
+    def _hits(self, rect):
+        """Return the indices of living aliens overlapping rect, in fleet order."""
+        left, top = self._rect_positions()
+        # The same test as Rect.colliderect.
+        overlap = (self.alive & (left < rect.right) & (left + self.width > rect.left)
+                   & (top < rect.bottom) & (top + self.height > rect.top))
+        return np.flatnonzero(overlap)
+
+    def _kill(self, indices):
+        """Remove the aliens at indices from play and return their sprites."""
+        self.alive[indices] = False
+        left, top = self._rect_positions()
+        killed = []
+        for index in indices:
+            alien = self.sprites[index]
+            alien.x = float(self.x[index])
+            alien.rect.topleft = (int(left[index]), int(top[index]))
+            alien.kill()
+            killed.append(alien)
+        return killed
+
+    def groupcollide(self, bullets):
+        """Kill bullets and the aliens they hit; map each bullet to its aliens.
+
+        Matches pygame.sprite.groupcollide(bullets, aliens, True, True).
+        """
+        crashed = {}
+        for bullet in bullets.sprites():
+            indices = self._hits(bullet.rect)
+            if len(indices):
+                crashed[bullet] = self._kill(indices)
+                bullet.kill()
+        return crashed
+
+    def collideany(self, rect):
+        """Return True if any living alien overlaps rect."""
+        return len(self._hits(rect)) > 0
+
+    def reached_bottom(self):
+        """Return True if any living alien reached the bottom of the screen."""
+        if not self.alive.any():
+            return False
+        return self.y[self.alive].max() + self.height >= self.screen_rect.bottom
+
+    def snapshot(self):
+        """Remember the positions before a simulation step."""
+        self.previous = self._rect_positions()
+
+    def draw(self, surface):
+        """Blit every living alien and return the rect they cover."""
+        indices = np.flatnonzero(self.alive)
+        if not len(indices):
+            return pygame.Rect(0, 0, 0, 0)
+
+        left, top = self._rect_positions()
+        if self.previous is not None and self.draw_alpha < 1.0:
+            previous_left, previous_top = self.previous
+            left = np.round(previous_left + (left - previous_left) * self.draw_alpha).astype(int)
+            top = np.round(previous_top + (top - previous_top) * self.draw_alpha).astype(int)
+        left, top = left[indices], top[indices]
+
+        surface.blits([(self.sprites[index].image, position) for index, position
+                       in zip(indices.tolist(), zip(left.tolist(), top.tolist()))],
+                      doreturn=False)
+
+        area = pygame.Rect(int(left.min()), int(top.min()),
+                           int(left.max() - left.min()) + self.width,
+                           int(top.max() - top.min()) + self.height)
+        return area.clip(surface.get_rect())
@@ -0,0 +1,190 @@
+import csv
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter, time
+
+import pygame
+
+
+PHASES = ["events", "network", "ship", "bullets", "aliens", "render"]
+
+
+class FrameProfiler:
+    """A class to time each phase of a frame and show the results in-game."""
+
+    def __init__(self, ai_game, history=300):
+        """Initialize empty timing history and the overlay font."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.font = pygame.font.SysFont(None, 22)
+
+        self.frame_times = deque(maxlen=history)
+        self.phase_times = {name: deque(maxlen=history) for name in PHASES}
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = None
+
+        self.overlay_visible = False
+        self.overlay_image = None
+        self.overlay_rect = None
+        self.last_overlay_refresh = 0.0
+
+        self.log_file = None
+        self.log_writer = None
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent inside the block to this frame's phase total."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] += perf_counter() - start
+
+    def start_frame(self):
+        """Finish the previous frame, if any, and start timing a new one."""
+        now = perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.append(now - self.frame_start)
+            for name, seconds in self.current.items():
+                self.phase_times[name].append(seconds)
+            if self.log_file:
+                self._write_sample(self.sample())
+        self.frame_start = now
+        self.current = dict.fromkeys(PHASES, 0.0)
+
+    def sprite_counts(self):
+        """Return how many sprites of each kind are alive."""
+        return {
+            "bullets": len(self.ai_game.bullets),
+            "aliens": len(self.ai_game.aliens),
+            "opponent_aliens": len(self.ai_game.opponent_aliens),
+        }
+
+    def network_backlog(self):
+        """Return the work waiting on or in the network threads."""
+        return {
+            "matchmaking_queue": self.ai_game.matchmaking_queue.qsize(),
+            "leaderboard_pending": int(self.ai_game.leaderboard_update_pending),
+            "chat_pending": int(self.ai_game.chat_update_pending),
+            "api_callbacks": self.ai_game.api.pending(),
+            "threads": threading.active_count(),
+        }
+
+    def sample(self):
+        """Return the most recent frame's metrics as a flat dictionary."""
+        sample = {
+            "time": round(time(), 3),
+            "fps": round(self.ai_game.clock.get_fps(), 1),
+            "frame_ms": round(self.frame_times[-1] * 1000, 3) if self.frame_times else 0.0,
+        }
+        for name in PHASES:
+            times = self.phase_times[name]
+            sample[f"{name}_ms"] = round(times[-1] * 1000, 3) if times else 0.0
+        sample.update(self.sprite_counts())
+        sample.update(self.network_backlog())
+        return sample
+
+    def toggle_overlay(self):
+        """Show or hide the in-game overlay."""
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_image = None
+        self.ai_game.renderer.request_full_redraw()
+
+    def draw_overlay(self):
+        """Draw the overlay in the top left corner and return the rect it covers."""
+        # Re-render a few times a second; text changing every frame is unreadable anyway.
+        now = perf_counter()
+        if (self.overlay_image is None
+                or now - self.last_overlay_refresh >= self.settings.profile_overlay_refresh):
+            self.overlay_image = self._build_overlay()
+            self.overlay_rect = self.overlay_image.get_rect(topleft=(10, 60))
+            self.last_overlay_refresh = now
+
+        self.screen.blit(self.overlay_image, self.overlay_rect)
+        return self.overlay_rect
+
+    def _build_overlay(self):
+        """Render the metrics panel, including a frame time histogram."""
+        lines = [f"FPS: {self.ai_game.clock.get_fps():.1f}"]
+        if self.frame_times:
+            average_ms = sum(self.frame_times) / len(self.frame_times) * 1000
+            worst_ms = max(self.frame_times) * 1000
+            lines.append(f"Frame: {average_ms:.2f} ms avg, {worst_ms:.2f} ms worst")
+        for name in PHASES:
+            times = self.phase_times[name]
+            if times:
+                lines.append(f"  {name}: {sum(times) / len(times) * 1000:.3f} ms")
+        counts = self.sprite_counts()
+        lines.append("Sprites: " + ", ".join(f"{key} {value}" for key, value in counts.items()))
+        backlog = self.network_backlog()
+        lines.append("Network: " + ", ".join(f"{key} {value}" for key, value in backlog.items()))
+
+        images = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        line_height = self.font.get_linesize()
+        histogram_height = 60
+        width = max(300, max(image.get_width() for image in images) + 20)
+        height = line_height * len(images) + histogram_height + 30
+
+        panel = pygame.Surface((width, height))
+        panel.fill((20, 20, 20))
+        y = 10
+        for image in images:
+            panel.blit(image, (10, y))
+            y += line_height
+
+        self._draw_histogram(panel, pygame.Rect(10, y + 10, width - 20, histogram_height))
+        return panel
+
+    def _draw_histogram(self, panel, area):
+        """Draw one bar per recent frame, scaled so the top is two target frames."""
+        pygame.draw.rect(panel, (50, 50, 50), area)
+        target = 1 / self.settings.max_fps if self.settings.max_fps else self.settings.time_step
+        scale = area.height / (target * 2)
+
+        times = list(self.frame_times)[-area.width:]
+        for offset, seconds in enumerate(times):
+            bar_height = min(area.height, int(seconds * scale))
+            color = (80, 200, 80) if seconds <= target * 1.1 else (220, 80, 80)
+            x = area.right - len(times) + offset
+            pygame.draw.line(panel, color, (x, area.bottom - 1), (x, area.bottom - bar_height))
+
+        target_y = area.bottom - int(target * scale)
+        pygame.draw.line(panel, (200, 200, 200), (area.left, target_y), (area.right - 1, target_y))
+
+    def toggle_logging(self):
+        """Start or stop writing per-frame metrics to settings.profile_log_path."""
+        if self.log_file:
+            self.stop_logging()
+        else:
+            self.start_logging(self.settings.profile_log_path)
+
+    def start_logging(self, path):
+        """Write one row per frame to path, as JSON lines or CSV by extension."""
+        try:
+            self.log_file = open(path, 'w', newline='')
+        except OSError as e:
+            print(f"Error opening profile log: {e}")
+            return
+        if path.endswith(".jsonl"):
+            self.log_writer = None
+        else:
+            self.log_writer = csv.DictWriter(self.log_file, fieldnames=list(self.sample()))
+            self.log_writer.writeheader()
+        print(f"Logging frame metrics to {path}")
+
+    def stop_logging(self):
+        """Close the metrics file."""
+        if self.log_file:
+            self.log_file.close()
+        self.log_file = None
+        self.log_writer = None
+
+    def _write_sample(self, sample):
+        """Append one frame's metrics to the open log file."""
+        if self.log_writer:
+            self.log_writer.writerow(sample)
+        else:
+            self.log_file.write(json.dumps(sample) + "\n")
@@ -0,0 +1,66 @@
+import pygame
+
+
+class RectCollider:
+    """A class to test sprites against a large group with one C call each.
+
+    The group's rects are kept in a list, so each query is a single
+    Rect.collidelistall() instead of a Python loop over the group. The
+    list holds the sprites' own Rect objects, which move in place, so it
+    only has to be rebuilt when sprites join or leave the group. Groups
+    smaller than threshold go straight to pygame's sprite functions,
+    which are faster there. Results match pygame.sprite.groupcollide and
+    spritecollideany, including the order hits are returned in.
+    """
+
+    def __init__(self, threshold=64):
+        """Initialize an empty rect list."""
+        self.threshold = threshold
+        self.sprites = []
+        self.rects = []
+        self.stale = True
+
+    def invalidate(self):
+        """Mark the rect list out of date, e.g. after a new fleet is built."""
+        self.stale = True
+
+    def _rects_for(self, group):
+        """Return the rect list for group, rebuilding it if it changed."""
+        # Kills and additions change the group's size; anything that could
+        # swap sprites without doing so calls invalidate().
+        if self.stale or len(self.sprites) != len(group):
+            self.sprites = group.sprites()
+            self.rects = [sprite.rect for sprite in self.sprites]
+            self.stale = False
+        return self.rects
+
+    def spritecollide(self, sprite, group, dokill=False):
+        """Return the sprites in group that collide with sprite."""
+        if len(group) < self.threshold:
+            return pygame.sprite.spritecollide(sprite, group, dokill)
+
+        rects = self._rects_for(group)
+        hits = [self.sprites[index] for index in sprite.rect.collidelistall(rects)]
+        if dokill:
+            for other in hits:
+                other.kill()
+        return hits
+
+    def spritecollideany(self, sprite, group):
+        """Return the first sprite in group that collides with sprite."""
+        if len(group) < self.threshold:
+            return pygame.sprite.spritecollideany(sprite, group)
+
+        index = sprite.rect.collidelist(self._rects_for(group))
+        return self.sprites[index] if index != -1 else None
+
+    def groupcollide(self, groupa, groupb, dokilla, dokillb):
+        """Map each sprite in groupa to the sprites in groupb it hits."""
+        crashed = {}
+        for sprite in groupa.sprites():
+            hits = self.spritecollide(sprite, groupb, dokillb)
+            if hits:
+                crashed[sprite] = hits
+                if dokilla:
+                    sprite.kill()
+        return crashed
@@ -0,0 +1,107 @@
+from collections import deque
+
+import pygame
+
+
+class DirtyRectRenderer:
+    """A class to redraw and push only the parts of the screen that changed."""
+
+    def __init__(self, ai_game):
+        """Initialize the renderer and its per-mode frame timings."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        self.background = pygame.Surface(self.screen.get_size()).convert()
+        self.background.fill(self.settings.bg_color)
+
+        self.last_rects = []
+        self.needs_full_redraw = True
+        self.full_redraw_count = 0
+        self.last_state = None
+
+        self.frame_times = {"full": deque(maxlen=600), "dirty": deque(maxlen=600)}
+
+    def request_full_redraw(self):
+        """Repaint and push the whole screen on the next frame."""
+        self.needs_full_redraw = True
+
+    def draw_frame(self):
+        """Draw the current screen, pushing as little as possible."""
+        # Entering or leaving a menu, or starting or ending a game, changes
+        # more than the sprites, so repaint everything once.
+        state = (self.ai_game._menu_screen_active(), self.ai_game.game_active)
+        if state != self.last_state:
+            self.needs_full_redraw = True
+            self.last_state = state
+
+        if self.ai_game._menu_screen_active():
+            # Menus only change in response to events or network updates,
+            # unless the profiler overlay is showing live numbers over them.
+            profiler = self.ai_game.profiler
+            if self.needs_full_redraw or self.ai_game.game_active or profiler.overlay_visible:
+                self.ai_game._draw_full_frame()
+                if profiler.overlay_visible:
+                    profiler.draw_overlay()
+                pygame.display.flip()
+                self.needs_full_redraw = False
+            self.last_rects = []
+            return
+
+        if self.needs_full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            self._clear_sprites()
+
+        dirty_rects = self._draw_sprites()
+
+        if self.needs_full_redraw:
+            pygame.display.flip()
+            self.needs_full_redraw = False
+            self.full_redraw_count += 1
+        else:
+            pygame.display.update(dirty_rects)
+
+    def _clear_sprites(self):
+        """Paint the background over everything drawn last frame."""
+        # A swarm's whole area is one rect, cleared in one blit.
+        for rect in self.last_rects:
+            self.screen.blit(self.background, rect, rect)
+
+    def _draw_sprites(self):
+        """Draw every sprite and return the rects that need pushing."""
+        # Sprites are drawn in the same order as a full redraw, and every
+        # drawn rect is cleared next frame.
+        drawn_rects = self.ai_game._draw_playfield()
+
+        sb = self.ai_game.sb
+        sb.show_score()
+        drawn_rects += [sb.score_rect.copy(), sb.high_score_rect.copy(),
+                        sb.level_rect.copy()]
+        drawn_rects += [ship.rect.copy() for ship in sb.ships.sprites()]
+
+        # The overlay goes on top, and its rect is cleared next frame like
+        # any other drawn rect.
+        if self.ai_game.profiler.overlay_visible:
+            drawn_rects.append(self.ai_game.profiler.draw_overlay().copy())
+
+        dirty_rects = self.last_rects + drawn_rects
+        self.last_rects = drawn_rects
+        return dirty_rects
+
+    def record_frame_time(self, mode, seconds):
+        """Store how long a frame took to draw in the given mode."""
+        self.frame_times[mode].append(seconds)
+
+    def frame_time_report(self):
+        """Return a summary comparing average frame times per mode."""
+        lines = []
+        for mode, times in self.frame_times.items():
+            if times:
+                average_ms = sum(times) / len(times) * 1000
+                worst_ms = max(times) * 1000
+                lines.append(f"{mode}: {average_ms:.2f} ms avg, "
+                             f"{worst_ms:.2f} ms worst over {len(times)} frames")
+            else:
+                lines.append(f"{mode}: no frames recorded")
+        return "Frame times - " + "; ".join(lines)
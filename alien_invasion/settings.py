@@ -16,11 +16,41 @@ class Settings:
 
         self.fleet_drop_speed = 10
 
+        # "sprite" moves each Alien on its own; "vector" moves the whole
+        # fleet with NumPy and falls back to "sprite" if NumPy is missing.
+        self.fleet_engine = "sprite"
+        # With the vector engine, a non-zero swarm_size replaces the
+        # regular fleet with that many aliens.
+        self.swarm_size = 0
+
+        # Groups with at least this many sprites are collision-checked
+        # against a cached rect list; smaller ones use pygame's functions.
+        # See benchmark.py --collisions for where the crossover lies.
+        self.collision_list_threshold = 64
+
         self.speedup_scale = 1.1
         self.score_scale = 1.5
 
         self.text_color = (30, 30, 30)
 
+        # The simulation advances in fixed steps, so the per-frame speeds
+        # below are per step no matter how fast frames are drawn.
+        self.time_step = 1 / 60
+        self.max_frame_time = 0.25
+        # Render frame cap; 0 draws as fast as possible.
+        self.max_fps = 60
+        self.vsync = False
+        self.interpolate_rendering = True
+
+        # "full" flips the whole screen every frame; "dirty" only pushes
+        # the rects that changed.
+        self.render_mode = "full"
+
+        # F3 shows the profiling overlay; F4 logs per-frame metrics to
+        # profile_log_path (CSV, or JSON lines for a .jsonl path).
+        self.profile_overlay_refresh = 0.25
+        self.profile_log_path = "frame_profile.csv"
+
         self.initialize_dynamic_settings()
 
     def initialize_dynamic_settings(self):
@@ -1,6 +1,8 @@
 import pygame
 from pygame.sprite import Sprite
 
+from asset_cache import assets
+
 
 class Ship(Sprite):
     """A class to manage the ship."""
@@ -12,7 +14,7 @@ class Ship(Sprite):
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
 
-        self.image = pygame.image.load('images/ship.bmp')
+        self.image = assets.get_image('images/ship.bmp')
         self.rect = self.image.get_rect()
 
         self.rect.midbottom = self.screen_rect.midbottom
@@ -29,6 +29,10 @@ class Slider:
 
         self.dragging = False
         self.value_text = "" # To store the formatted value string
+        self.value_img = None
+
+        # The label never changes, so render it once.
+        self.name_img = self.font.render(f"{self.name}:", True, self.text_color)
 
     def _update_handle_pos(self):
         """Update the position of the handle based on the current value."""
@@ -76,22 +80,25 @@ class Slider:
         pygame.draw.rect(self.screen, self.handle_color, self.handle_rect)
         pygame.draw.rect(self.screen, (0,0,0), self.handle_rect, 1) # Border for handle
 
-        name_img = self.font.render(f"{self.name}:", True, self.text_color)
-        name_rect = name_img.get_rect()
+        name_rect = self.name_img.get_rect()
         name_rect.right = self.rect.left - 10 # 10px padding to the left of slider
         name_rect.centery = self.rect.centery
-        self.screen.blit(name_img, name_rect)
+        self.screen.blit(self.name_img, name_rect)
 
         if self.is_float:
-            self.value_text = f"{self.current_val:.1f}" # Display floats with 1 decimal place
+            value_text = f"{self.current_val:.1f}" # Display floats with 1 decimal place
         else:
-            self.value_text = str(self.current_val)
+            value_text = str(self.current_val)
+
+        # Only re-render the value when it actually changed.
+        if value_text != self.value_text or self.value_img is None:
+            self.value_text = value_text
+            self.value_img = self.font.render(self.value_text, True, self.text_color)
             
-        value_img = self.font.render(self.value_text, True, self.text_color)
-        value_rect = value_img.get_rect()
+        value_rect = self.value_img.get_rect()
         value_rect.left = self.rect.right + 10 # 10px padding to the right of slider
         value_rect.centery = self.rect.centery
-        self.screen.blit(value_img, value_rect)
+        self.screen.blit(self.value_img, value_rect)
 
     def get_value(self):
         """Return the current value of the slider."""
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The game imports its modules by bare name and loads images relative to
+# its own directory, and the tests have no display or sound card.
+sys.path.insert(0, GAME_DIR)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@pytest.fixture
+def make_game(monkeypatch):
+    """Return a function creating headless games already in play."""
+    monkeypatch.chdir(GAME_DIR)
+    from Alien_Invasion import AlienInvasion
+
+    def make():
+        ai = AlienInvasion(headless=True)
+        ai.username = "tester"
+        ai.title_screen_active = False
+        ai.login_screen_active = False
+        ai.game_active = True
+        return ai
+    return make
+
+
+@pytest.fixture
+def game(make_game):
+    """Return a headless game already in play, with the regular fleet."""
+    return make_game()
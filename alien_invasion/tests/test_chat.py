@@ -0,0 +1,37 @@
+import json
+
+
+def chat(message_id, text):
+    return {"id": message_id, "type": "chat_message", "room": "global",
+            "username": "someone", "message": text}
+
+
+def kept_ids(game):
+    return [message["id"] for message in game.chat_messages]
+
+
+def test_live_message_does_not_hide_history(game):
+    # The stream delivers a new message before the history request returns.
+    game._handle_sse_message(json.dumps(chat(105, "live")))
+    game.api.process_callbacks()
+    for message in [chat(101, "a"), chat(103, "b"), chat(105, "live")]:
+        game._add_chat_message(message)
+
+    assert kept_ids(game) == [101, 103, 105]
+    assert game.chat_last_id == 105
+
+
+def test_stream_messages_wait_for_the_main_loop(game):
+    game._handle_sse_message(json.dumps(chat(7, "hi")))
+    assert not game.chat_messages
+
+    game.api.process_callbacks()
+    assert kept_ids(game) == [7]
+
+
+def test_only_the_newest_messages_are_kept(game):
+    for message_id in range(10, 70):
+        game._add_chat_message(chat(message_id, str(message_id)))
+    game._add_chat_message(chat(5, "too old"))
+
+    assert kept_ids(game) == list(range(20, 70))
@@ -0,0 +1,44 @@
+def step(ai):
+    """Run one simulation step of the ship and bullets."""
+    ai._snapshot_positions()
+    ai.ship.update()
+    ai.bullets.update()
+
+
+def test_recycled_bullet_is_drawn_where_it_was_fired(game):
+    game.settings.bullets_allowed = 1
+    game._fire_bullet()
+    first = next(iter(game.bullets))
+    for _ in range(40):
+        step(game)
+    # The bullet leaves play mid-screen, after its position was snapshotted.
+    first.kill()
+
+    # Fire again on a frame that runs no simulation step.
+    game._fire_bullet()
+    bullet = next(iter(game.bullets))
+    assert bullet is first
+    fired_at = bullet.rect.topleft
+
+    game.render_alpha = 0.5
+    drawn = game._interpolate_positions(game.render_alpha)
+    drawn_at = bullet.rect.topleft
+    game._restore_positions(drawn)
+
+    assert drawn_at == fired_at
+    assert bullet.rect.topleft == fired_at
+
+
+def test_recycled_bullet_renders_at_the_ship(game):
+    game.settings.bullets_allowed = 1
+    game._fire_bullet()
+    for _ in range(40):
+        step(game)
+    next(iter(game.bullets)).kill()
+
+    game._fire_bullet()
+    bullet = next(iter(game.bullets))
+    game.render_alpha = 0.5
+    game._update_screen()
+
+    assert game.screen.get_at(bullet.rect.center)[:3] == game.settings.bullet_color
@@ -0,0 +1,51 @@
+import hashlib
+import random
+
+import pygame
+
+
+def frame_hashes(game, mode, frames):
+    """Play frames of scripted input in a render mode and hash each frame."""
+    random.seed(0)
+    game.settings.render_mode = mode
+    game.renderer.request_full_redraw()
+    game.aliens.empty()
+    game._create_fleet()
+    game.ship.moving_right = True
+
+    hashes = []
+    for frame in range(frames):
+        game.stats.ships_left = game.settings.ship_limit
+        if frame % 4 == 0:
+            game._fire_bullet()
+        game._snapshot_positions()
+        game.ship.update()
+        game._update_bullets()
+        game._update_aliens()
+        game.render_alpha = 0.5
+        game._update_screen()
+        hashes.append(hashlib.md5(pygame.image.tobytes(game.screen, "RGB")).hexdigest())
+    return hashes
+
+
+def test_bullet_over_alien_is_layered_the_same(game):
+    alien = game.aliens.sprites()[0]
+    game._fire_bullet()
+    bullet = game.bullets.sprites()[0]
+    bullet.rect.center = alien.rect.center
+
+    game.settings.render_mode = "full"
+    game._update_screen()
+    full = pygame.image.tobytes(game.screen, "RGB")
+
+    game.settings.render_mode = "dirty"
+    game._update_screen()  # a full redraw on switching modes
+    game._update_screen()  # a dirty-rect frame
+    assert game.renderer.needs_full_redraw is False
+    assert pygame.image.tobytes(game.screen, "RGB") == full
+
+
+def test_dirty_frames_match_full_redraws(make_game):
+    full = frame_hashes(make_game(), "full", 300)
+    dirty = frame_hashes(make_game(), "dirty", 300)
+    assert dirty == full
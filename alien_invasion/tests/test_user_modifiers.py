@@ -0,0 +1,43 @@
+def load_modifiers(game, monkeypatch, **modifiers):
+    """Run _load_user_modifiers against a canned server response."""
+    def get(path, on_success=None, on_error=None, **kwargs):
+        on_success(modifiers)
+    monkeypatch.setattr(game.api, "get", get)
+    game._load_user_modifiers()
+
+
+def click_play(game):
+    game.game_active = False
+    game.title_screen_active = False
+    game._check_play_button(game.play_button.rect.center)
+
+
+def test_bonus_lives_are_added_at_game_start(game, monkeypatch):
+    load_modifiers(game, monkeypatch, bonus_lives=1)
+    click_play(game)
+    assert game.stats.ships_left == game.settings.ship_limit + 1
+
+
+def test_no_bonus_lives_without_the_modifier(game, monkeypatch):
+    load_modifiers(game, monkeypatch, bonus_lives=0)
+    click_play(game)
+    assert game.stats.ships_left == game.settings.ship_limit
+
+
+def test_banned_player_scores_are_not_recorded(game, monkeypatch):
+    load_modifiers(game, monkeypatch, banned=True)
+    game.stats.score = 500
+    game.stats.ships_left = 0
+    game._ship_hit()
+
+    assert not game.game_active
+    assert game.username not in game.high_scores
+
+
+def test_scores_are_recorded_when_not_banned(game, monkeypatch):
+    load_modifiers(game, monkeypatch, banned=False)
+    game.stats.score = 500
+    game.stats.ships_left = 0
+    game._ship_hit()
+
+    assert game.high_scores[game.username] == 500
@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """A class to reuse rendered text, evicting the least recently used."""
+
+    def __init__(self, max_entries=256):
+        """Initialize the cache with a fixed number of surfaces."""
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, bg=None, antialias=True):
+        """Return a surface for text, rendering it only on a cache miss."""
+        key = (font, text, tuple(color), tuple(bg) if bg else None, antialias)
+        image = self.surfaces.get(key)
+        if image is not None:
+            self.surfaces.move_to_end(key)
+            return image
+
+        image = font.render(text, antialias, color, bg)
+        self.surfaces[key] = image
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return image
+
+    def clear(self):
+        """Drop every cached surface."""
+        self.surfaces.clear()
+
+
+# Shared by every screen so identical labels are only rendered once.
+text_cache = TextCache()
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from collections import deque
+
+
+class Subscription:
+    """One subscriber's bounded queue of (event_id, data) messages."""
+
+    def __init__(self, hub, max_queued, channels=None):
+        self.hub = hub
+        self.max_queued = max_queued
+        self.channels = channels
+        self.messages = deque()
+        self.dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, event_id, data):
+        # A subscriber that can't keep up loses its oldest messages rather
+        # than holding up the publisher or growing without limit.
+        with self.condition:
+            if len(self.messages) >= self.max_queued:
+                self.messages.popleft()
+                self.dropped += 1
+            self.messages.append((event_id, data))
+            self.condition.notify()
+        self._wake()
+
+    def _wake(self):
+        # Hook for subscribers that wait on something other than the condition.
+        pass
+
+    def get(self, timeout=None):
+        # Block until a message arrives; None means the timeout passed or
+        # the subscription was closed.
+        with self.condition:
+            if not self.messages and not self.closed:
+                self.condition.wait(timeout)
+            if self.messages:
+                return self.messages.popleft()
+            return None
+
+    def get_nowait(self):
+        with self.condition:
+            if self.messages:
+                return self.messages.popleft()
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self._wake()
+
+
+class AsyncSubscription(Subscription):
+    """A subscription read from an asyncio event loop without a thread per subscriber."""
+
+    def __init__(self, hub, max_queued, channels=None):
+        super().__init__(hub, max_queued, channels)
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+
+    def _wake(self):
+        # Publishers run on worker threads, so hand the wakeup to the loop.
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            pass  # The loop has shut down.
+
+    async def get_async(self, timeout=None):
+        self.ready.clear()
+        message = self.get_nowait()
+        if message is not None or self.closed:
+            return message
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.get_nowait()
+
+
+class BroadcastHub:
+    """Publish messages to every subscriber the moment they are sent.
+
+    Each message gets an increasing event id. Recent messages are kept so a
+    client reconnecting with Last-Event-ID gets what it missed.
+
+    A message published to a channel only reaches subscribers of that
+    channel and subscribers that gave no channels; one published without a
+    channel reaches everyone. Subscribers are indexed by channel, so the
+    cost of a publish grows with the channel's audience, not the total.
+    """
+
+    def __init__(self, history=100, max_queued=100):
+        self.max_queued = max_queued
+        self.history = deque(maxlen=history)
+        self.subscribers = set()
+        self.unfiltered = set()
+        self.by_channel = {}
+        self.last_event_id = 0
+        self.lock = threading.Lock()
+
+    def publish(self, data, channel=None):
+        with self.lock:
+            self.last_event_id += 1
+            event_id = self.last_event_id
+            self.history.append((event_id, channel, data))
+            if channel is None:
+                subscribers = list(self.subscribers)
+            else:
+                subscribers = [*self.unfiltered, *self.by_channel.get(channel, ())]
+        for subscription in subscribers:
+            subscription.put(event_id, data)
+        return event_id
+
+    def subscribe(self, last_event_id=None, subscription_class=Subscription, channels=None):
+        channels = frozenset(channels) if channels else None
+        subscription = subscription_class(self, self.max_queued, channels)
+        with self.lock:
+            if last_event_id is not None:
+                for event_id, channel, data in self.history:
+                    if event_id > last_event_id and self._reaches(subscription, channel):
+                        subscription.put(event_id, data)
+            self.subscribers.add(subscription)
+            if channels is None:
+                self.unfiltered.add(subscription)
+            for channel in channels or ():
+                self.by_channel.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription not in self.subscribers:
+                return
+            self.subscribers.discard(subscription)
+            self.unfiltered.discard(subscription)
+            for channel in subscription.channels or ():
+                channel_subscribers = self.by_channel[channel]
+                channel_subscribers.discard(subscription)
+                if not channel_subscribers:
+                    del self.by_channel[channel]
+
+    def subscriber_count(self, channel=None):
+        with self.lock:
+            if channel is None:
+                return len(self.subscribers)
+            return len(self.unfiltered) + len(self.by_channel.get(channel, ()))
+
+    def recent(self, since=0, channels=None):
+        with self.lock:
+            return [(event_id, data) for event_id, channel, data in self.history
+                    if event_id > since and (channels is None or channel is None or channel in channels)]
+
+    @staticmethod
+    def _reaches(subscription, channel):
+        return subscription.channels is None or channel is None or channel in subscription.channels
+
+
+def format_sse(event_id, data):
+    return f'id: {event_id}\ndata: {data}\n\n'
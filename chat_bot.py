@@ -5,8 +5,8 @@ class ChatBot:
         self.server_url = server_url
         self.bot_username = bot_username
 
-    def send_message(self, message):
-        payload = {"username": self.bot_username, "message": message}
+    def send_message(self, message, room="global"):
+        payload = {"username": self.bot_username, "message": message, "room": room}
         try:
             response = requests.post(f"{self.server_url}/api/chat", json=payload, timeout=5)
             response.raise_for_status()
@@ -16,7 +16,7 @@ class ChatBot:
 
     def handle_command(self, command):
         if command == "/help":
-            self.send_message("Available commands: /help, /rules, /leaderboard")
+            self.send_message("Available commands: /help, /rules, /leaderboard, /rank <username>")
         elif command == "/rules":
             self.send_message("Chat Rules: Be respectful. No spamming. Follow the community guidelines.")
         elif command == "/leaderboard":
@@ -31,9 +31,27 @@ class ChatBot:
             except requests.exceptions.RequestException as e:
                 print(f"Error fetching leaderboard: {e}")
                 self.send_message("Error fetching leaderboard. Please try again later.")
+        elif command == "/rank" or command.startswith("/rank "):
+            username = command[len("/rank"):].strip()
+            if not username:
+                self.send_message("Usage: /rank <username>")
+                return
+            try:
+                response = requests.get(f"{self.server_url}/api/rank", params={"username": username}, timeout=5)
+                if response.status_code == 404:
+                    self.send_message(f"{username} has no score yet.")
+                    return
+                response.raise_for_status()
+                rank = response.json()
+                rank_message = (f"{rank['username']} is #{rank['rank']} of {rank['total']} with {rank['score']} "
+                                f"({rank['percentile']} percentile)")
+                self.send_message(rank_message)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching rank: {e}")
+                self.send_message("Error fetching rank. Please try again later.")
         elif command == "/rankings":
             try:
-                response = requests.get(f"{self.server_url}/api/multiplayer_rankings", timeout=5)
+                response = requests.get(f"{self.server_url}/api/multiplayer_rankings", params={"limit": 10}, timeout=5)
                 response.raise_for_status()
                 rankings = response.json()
                 rankings_message = "Multiplayer Rankings:\n" + "\n".join(
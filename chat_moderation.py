@@ -0,0 +1,102 @@
+import re
+import unicodedata
+
+
+# Digits and symbols commonly swapped in for letters to get past a filter.
+# Punctuation is left alone so it still ends a word for whole_words.
+LOOKALIKES = str.maketrans({'0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a'})
+
+
+def normalize_text(text):
+    # Casefold, drop accents, undo lookalike characters and collapse runs of
+    # whitespace, so "Ḃ0mb" and "kill   yourself" read like the plain terms.
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.translate(LOOKALIKES).split())
+
+
+def trie_pattern(terms):
+    # Build a regex from a trie of the terms, so terms sharing a prefix share
+    # its branch: "gun", "guns" and "gunfire" become gun(?:fire|s)?. The
+    # engine then tests each position against the trie instead of trying
+    # every term in turn.
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    ends_here = '' in node
+    branches = [re.escape(char) + _node_pattern(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if ends_here else pattern
+
+
+class ChatFilter:
+    """Find banned terms in chat messages with one compiled pattern.
+
+    whole_words only matches terms that aren't part of a longer word, and
+    normalize matches through case, accents, lookalike characters and extra
+    spacing. The pattern is rebuilt by update(); lookups in flight keep
+    using the previous one.
+    """
+
+    def __init__(self, terms=(), whole_words=False, normalize=True):
+        self.compiled = None
+        self.update(terms, whole_words, normalize)
+
+    def update(self, terms, whole_words=None, normalize=None):
+        if whole_words is None:
+            whole_words = self.compiled.whole_words
+        if normalize is None:
+            normalize = self.compiled.normalize
+        self.compiled = CompiledTerms(terms, whole_words, normalize)
+
+    @property
+    def terms(self):
+        return self.compiled.terms
+
+    def find(self, message):
+        # Return the banned term the message contains, or None.
+        return self.compiled.find(message)
+
+
+class CompiledTerms:
+    """One immutable build of a ChatFilter's terms and options."""
+
+    def __init__(self, terms, whole_words, normalize):
+        self.whole_words = whole_words
+        self.normalize = normalize
+        self.terms = list(dict.fromkeys(terms))
+
+        # Several terms can normalize to the same text; report the first.
+        self.originals = {}
+        for term in self.terms:
+            key = self._prepare(term)
+            if key:
+                self.originals.setdefault(key, term)
+
+        self.pattern = None
+        if self.originals:
+            pattern = trie_pattern(self.originals)
+            if whole_words:
+                pattern = rf'(?<!\w){pattern}(?!\w)'
+            self.pattern = re.compile(pattern)
+
+    def _prepare(self, text):
+        return normalize_text(text) if self.normalize else text.lower()
+
+    def find(self, message):
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(self._prepare(message))
+        return self.originals[match.group()] if match else None
@@ -1,11 +1,29 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, abort, g, make_response, request, jsonify, Response
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, event, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import re
 import time
 import json
+import hashlib
+import multiprocessing
+import secrets
+import sqlite3
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import wraps
+from itertools import islice
 from stem.control import Controller
 from datetime import datetime, timedelta
+from broadcast_hub import BroadcastHub, format_sse
+from chat_moderation import ChatFilter
+from rate_limiter import RateLimit, RateLimiter, retry_after_header
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 DATABASE_PATH = os.path.join(script_dir, 'leaderboard.db')
@@ -15,18 +33,91 @@ app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + DATABASE_PATH
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 
-sse_message_queue = []
-chat_message_queue = []
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets reads carry on during writes and skips an fsync per commit.
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+sse_hub = BroadcastHub(history=100, max_queued=100)
+SSE_KEEPALIVE_SECONDS = 15
+RANKINGS_DEFAULT_LIMIT = 100
+RANKINGS_MAX_LIMIT = 500
+RANK_MAX_NEIGHBOURS = 10
+SCORE_BATCH_MAX = 1000
+
+# SSE channels: leaderboard updates, and one channel per chat room such as
+# chat:global, chat:match:42 or chat:lobby:3.
+LEADERBOARD_CHANNEL = 'leaderboard'
+DEFAULT_CHAT_ROOM = 'global'
+MAX_CHAT_ROOMS = 1000
+MAX_STREAM_CHANNELS = 20
+ROOM_NAME_PATTERN = re.compile(r'[A-Za-z0-9_.:-]{1,64}')
+
+# (per user, per IP address) limits on each write route, as a burst size
+# and the seconds it takes to refill. The IP limits are looser so players
+# sharing an address don't throttle each other, but still stop one client
+# from dodging its limit by switching names. Set RATE_LIMIT_DB_PATH to a
+# file (e.g. os.path.join(script_dir, 'rate_limits.db')) to keep buckets
+# across restarts and share them between server processes.
+RATE_LIMITS = {
+    'auth': (None, RateLimit(10, 60)),
+    'chat': (RateLimit(5, 5), RateLimit(25, 5)),
+    'chat_report': (RateLimit(5, 300), RateLimit(20, 300)),
+    'scores': (RateLimit(10, 10), RateLimit(50, 10)),
+    'scores_batch': (None, RateLimit(5, 60)),
+    'multiplayer_rankings': (RateLimit(10, 10), RateLimit(50, 10)),
+}
+RATE_LIMIT_DB_PATH = None
+
+# Password hashing is deliberately slow, so it runs in worker processes
+# where it can't hold the GIL over every other request. 0 hashes in the
+# request thread instead.
+PASSWORD_HASH_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+SESSION_TOKEN_LIFETIME = timedelta(days=7)
+rate_limiter = RateLimiter({f'{route}:{kind}': limit
+                            for route, limits in RATE_LIMITS.items()
+                            for kind, limit in zip(('user', 'ip'), limits) if limit},
+                           RATE_LIMIT_DB_PATH)
+
+def rate_limited(route, user_field='username'):
+    # Limit the view by the acting user named in the JSON body, then by
+    # the client's address, answering 429 with Retry-After when either
+    # bucket is empty.
+    def decorator(view):
+        @wraps(view)
+        def limited_view(*args, **kwargs):
+            checks = []
+            data = request.get_json(silent=True)
+            if g.session_username:
+                checks.append((f'{route}:user', g.session_username))
+            elif isinstance(data, dict) and isinstance(data.get(user_field), str):
+                checks.append((f'{route}:user', data[user_field]))
+            checks.append((f'{route}:ip', request.remote_addr))
+            retry_after = 0.0
+            for name, key in checks:
+                retry_after = rate_limiter.hit(name, key)
+                if retry_after:
+                    break
+            if retry_after:
+                response = jsonify({'error': 'Too many requests. Please slow down.',
+                                    'retry_after': round(retry_after, 2)})
+                response.status_code = 429
+                response.headers['Retry-After'] = retry_after_header(retry_after)
+                return response
+            return view(*args, **kwargs)
+        return limited_view
+    return decorator
 
 SOCIAL_SCORE_FILE = os.path.join(script_dir, 'social_scores.json')
 NEG_REPORTS_FILE = os.path.join(script_dir, 'neg_reports.json')
 POS_REPORTS_FILE = os.path.join(script_dir, 'pos_reports.json')
 
-social_scores = {}
-kick_list = {}  # Track kicked users and their ban expiration
-kick_count = {}  # Track the number of kicks for each user
 banned_words = ["nigger", "kill yourself","sex","child porn", "porn","sex","murder","suicide","guns","gun","firearm","bomb"] # Admin-defined list of banned words
-user_warnings = {}  # Track warnings issued to users
+chat_filter = ChatFilter(banned_words)
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -43,16 +134,161 @@ class Score(db.Model):
     banned = db.Column(db.Boolean, default=False, nullable=False)
     bonus_lives = db.Column(db.Integer, default=0, nullable=False)
 
+    # The leaderboard filters on banned and sorts by score, so both are read
+    # straight off this index instead of sorting the table.
+    __table_args__ = (db.Index('ix_score_banned_score', 'banned', 'score'),)
+
     def __repr__(self):
         return f'<Score {self.username}: {self.score} (Banned: {self.banned})>'
 
+class UserStanding(db.Model):
+    # Social score and moderation history, kept across restarts.
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), nullable=False, unique=True)
+    social_score = db.Column(db.Integer, default=100, nullable=False)
+    kick_count = db.Column(db.Integer, default=0, nullable=False)
+    kicked_until = db.Column(db.DateTime, nullable=True)
+    warnings = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<UserStanding {self.username}: {self.social_score} (Kicks: {self.kick_count})>'
+
+class Report(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), nullable=False)
+    report_type = db.Column(db.String(10), nullable=False)  # "positive" or "negative"
+    reporter = db.Column(db.String(80), nullable=False, default='Anonymous')
+    reason = db.Column(db.String(200), nullable=False, default='')
+    timestamp = db.Column(db.Float, nullable=False, default=time.time)
+
+    # Penalty and bonus lookups count one user's reports of one type.
+    __table_args__ = (db.Index('ix_report_username_type', 'username', 'report_type'),)
+
+    def __repr__(self):
+        return f'<Report {self.report_type} {self.username} by {self.reporter}>'
+
+class LeaderboardCache:
+    # The top scores, serialized once and shared by every /api/leaderboard
+    # request until a write that can change them.
+    def __init__(self, size=10):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = None
+        self.body = None
+        self.etag = None
+
+    def get(self):
+        # Holding the lock while rebuilding means a burst of requests after
+        # an invalidation runs the query once, not once per request.
+        with self.lock:
+            if self.body is None:
+                top_scores = Score.query.filter_by(banned=False).order_by(Score.score.desc()).limit(self.size).all()
+                self.entries = [{'username': score.username, 'score': score.score} for score in top_scores]
+                self.body = json.dumps(self.entries, separators=(',', ':')).encode()
+                self.etag = hashlib.sha1(self.body).hexdigest()
+            return self.body, self.etag
+
+    def invalidate(self):
+        with self.lock:
+            self.entries = None
+            self.body = None
+            self.etag = None
+
+    def note_score(self, username, score):
+        # Call after committing a new or raised score. Returns True, and drops
+        # the cache, only if the score can change the top entries.
+        with self.lock:
+            if self.entries is not None and len(self.entries) >= self.size:
+                cached_names = {entry['username'] for entry in self.entries}
+                if username not in cached_names and score < self.entries[-1]['score']:
+                    return False
+            self.entries = None
+            self.body = None
+            self.etag = None
+            return True
+
+leaderboard_cache = LeaderboardCache()
+
+class SessionToken(db.Model):
+    # Only a hash of each token is stored, so a copy of the database can't
+    # be used to sign in.
+    id = db.Column(db.Integer, primary_key=True)
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    username = db.Column(db.String(80), nullable=False, index=True)
+    expires = db.Column(db.DateTime, nullable=False)
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_session_token(username):
+    # Drop this user's expired tokens while we're here, then add a new one.
+    now = datetime.now()
+    SessionToken.query.filter(SessionToken.username == username,
+                              SessionToken.expires <= now).delete(synchronize_session=False)
+    token = secrets.token_urlsafe(32)
+    db.session.add(SessionToken(token_hash=hash_token(token), username=username,
+                                expires=now + SESSION_TOKEN_LIFETIME))
+    db.session.commit()
+    return token
+
+@app.before_request
+def load_session_token():
+    # Requests sending "Authorization: Bearer <token>" act as the token's
+    # user. A bad or expired token is only refused by routes that act for a
+    # user (see is_acting_user), so public reads keep working without it.
+    g.session_username = None
+    g.session_token_invalid = False
+    authorization = request.headers.get('Authorization', '')
+    if not authorization.startswith('Bearer '):
+        return None
+    session_token = SessionToken.query.filter_by(token_hash=hash_token(authorization[len('Bearer '):])).first()
+    if not session_token or session_token.expires <= datetime.now():
+        g.session_token_invalid = True
+        return None
+    g.session_username = session_token.username
+    return None
+
+def is_acting_user(username):
+    # Without a token the request is trusted as before; with one, it may
+    # only act as the token's user. A bad token ends the request with 401
+    # rather than falling back to trusting it.
+    if g.session_token_invalid:
+        abort(make_response(jsonify({'error': 'Invalid or expired session token.'}), 401))
+    return g.session_username is None or g.session_username == username
+
+password_pool = None
+password_pool_lock = threading.Lock()
+
+def run_password_task(function, *args):
+    # Run a werkzeug hashing function in the worker pool and wait for it.
+    # The request thread blocks, but other requests' threads keep running.
+    global password_pool
+    if PASSWORD_HASH_WORKERS <= 0:
+        return function(*args)
+    with password_pool_lock:
+        if password_pool is None:
+            # spawn, because forking a process that is already serving
+            # requests on several threads can copy a held lock.
+            password_pool = ProcessPoolExecutor(PASSWORD_HASH_WORKERS,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        pool = password_pool
+    try:
+        return pool.submit(function, *args).result()
+    except BrokenProcessPool:
+        # A worker died. Hash this one here and start a new pool next time.
+        with password_pool_lock:
+            if password_pool is pool:
+                password_pool = None
+        return function(*args)
+
 class MultiplayerRanking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), nullable=False, unique=True)
-    wins = db.Column(db.Integer, default=0, nullable=False)
+    wins = db.Column(db.Integer, default=0, nullable=False, index=True)
     losses = db.Column(db.Integer, default=0, nullable=False)
 
 @app.route('/api/register', methods=['POST'])
+@rate_limited('auth')
 def register_user():
     data = request.get_json()
     if not data or 'username' not in data or 'password' not in data:
@@ -64,16 +300,16 @@ def register_user():
     if User.query.filter_by(username=username).first():
         return jsonify({'error': 'Username already exists.'}), 400
 
-    password_hash = generate_password_hash(password)
+    password_hash = run_password_task(generate_password_hash, password)
     new_user = User(username=username, password_hash=password_hash)
     db.session.add(new_user)
+    adjust_standing(username, social_score=100)
     db.session.commit()
 
-    social_scores[username] = 100
-
     return jsonify({'success': True, 'message': 'User registered successfully.'}), 201
 
 @app.route('/api/login', methods=['POST'])
+@rate_limited('auth')
 def login_user():
     data = request.get_json()
     if not data or 'username' not in data or 'password' not in data:
@@ -83,12 +319,25 @@ def login_user():
     password = data['password']
 
     user = User.query.filter_by(username=username).first()
-    if not user or not check_password_hash(user.password_hash, password):
+    if not user or not run_password_task(check_password_hash, user.password_hash, password):
         return jsonify({'error': 'Invalid username or password.'}), 401
 
-    return jsonify({'success': True, 'message': 'Login successful.'}), 200
+    # Later requests send the token instead of the password.
+    token = issue_session_token(username)
+    return jsonify({'success': True, 'message': 'Login successful.', 'token': token,
+                    'expires_in': int(SESSION_TOKEN_LIFETIME.total_seconds())}), 200
+
+@app.route('/api/logout', methods=['POST'])
+def logout_user():
+    authorization = request.headers.get('Authorization', '')
+    if not g.session_username:
+        return jsonify({'error': 'A session token is required.'}), 401
+    SessionToken.query.filter_by(token_hash=hash_token(authorization[len('Bearer '):])).delete()
+    db.session.commit()
+    return jsonify({'message': 'Logged out.'}), 200
 
 @app.route('/api/scores', methods=['POST'])
+@rate_limited('scores')
 def add_score():
     data = request.get_json()
     if not data or 'username' not in data or 'score' not in data:
@@ -97,6 +346,8 @@ def add_score():
     username = data['username']
     score_value = data['score']
     message_to_send = None
+    if not is_acting_user(username):
+        return jsonify({'error': 'Session token belongs to another user.'}), 403
 
     existing_score = Score.query.filter_by(username=username).first()
 
@@ -106,7 +357,8 @@ def add_score():
         if score_value > existing_score.score:
             existing_score.score = score_value
             db.session.commit()
-            message_to_send = json.dumps({"type": "leaderboard_update", "message": f"Score updated for {username} to {score_value}"})
+            if leaderboard_cache.note_score(username, score_value):
+                message_to_send = json.dumps({"type": "leaderboard_update", "message": f"Score updated for {username} to {score_value}"})
             response_message = {'message': 'Score updated successfully'}
             status_code = 200
         else:
@@ -116,22 +368,84 @@ def add_score():
         new_score = Score(username=username, score=score_value)
         db.session.add(new_score)
         db.session.commit()
-        message_to_send = json.dumps({"type": "leaderboard_update", "message": f"New score added for {username}: {score_value}"})
+        if leaderboard_cache.note_score(username, score_value):
+            message_to_send = json.dumps({"type": "leaderboard_update", "message": f"New score added for {username}: {score_value}"})
         response_message = {'message': 'Score added successfully'}
         status_code = 201
 
     if message_to_send:
-        sse_message_queue.append(message_to_send)
-        if len(sse_message_queue) > 20:
-            sse_message_queue.pop(0)
+        sse_hub.publish(message_to_send, LEADERBOARD_CHANNEL)
 
     return jsonify(response_message), status_code
 
+@app.route('/api/scores/batch', methods=['POST'])
+@rate_limited('scores_batch')
+def add_scores_batch():
+    # Body: {"scores": [{"username": ..., "score": ...}, ...]}. Scores follow
+    # the same rules as /api/scores but go to the database in one upsert and
+    # one commit, followed by at most one leaderboard notification.
+    data = request.get_json()
+    if not data or not isinstance(data.get('scores'), list):
+        return jsonify({'error': 'Invalid data. A list of scores is required.'}), 400
+    if len(data['scores']) > SCORE_BATCH_MAX:
+        return jsonify({'error': f'At most {SCORE_BATCH_MAX} scores per request.'}), 400
+
+    best = {}
+    for position, entry in enumerate(data['scores']):
+        if (not isinstance(entry, dict) or not isinstance(entry.get('username'), str) or not entry['username']
+                or not isinstance(entry.get('score'), int) or isinstance(entry['score'], bool)):
+            return jsonify({'error': f'Invalid score at position {position}. Username and score are required.'}), 400
+        username = entry['username']
+        if not is_acting_user(username):
+            return jsonify({'error': f'Session token belongs to another user (score at position {position}).'}), 403
+        best[username] = max(entry['score'], best.get(username, entry['score']))
+
+    existing = {score.username: score for score in Score.query.filter(Score.username.in_(best)).all()}
+    added, updated, unchanged, banned = [], [], [], []
+    for username, score_value in best.items():
+        current = existing.get(username)
+        if current is None:
+            added.append(username)
+        elif current.banned:
+            banned.append(username)
+        elif score_value > current.score:
+            updated.append(username)
+        else:
+            unchanged.append(username)
+
+    changed = added + updated
+    if changed:
+        # The WHERE keeps this safe against scores or bans written since the
+        # read above: a row is only raised, and never once banned.
+        statement = sqlite_insert(Score)
+        statement = statement.on_conflict_do_update(
+            index_elements=['username'],
+            set_={'score': statement.excluded.score},
+            where=(Score.banned == False) & (Score.score < statement.excluded.score),
+        )
+        db.session.execute(statement, [
+            {'username': username, 'score': best[username], 'banned': False, 'bonus_lives': 0}
+            for username in changed
+        ])
+        db.session.commit()
+
+        if any(leaderboard_cache.note_score(username, best[username]) for username in changed):
+            sse_hub.publish(json.dumps({"type": "leaderboard_update",
+                                        "message": f"{len(changed)} scores submitted"}),
+                           LEADERBOARD_CHANNEL)
+
+    return jsonify({'added': added, 'updated': updated, 'unchanged': unchanged, 'banned': banned}), 200
+
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
-    top_scores = Score.query.filter_by(banned=False).order_by(Score.score.desc()).limit(10).all()
-    leaderboard = [{'username': score.username, 'score': score.score} for score in top_scores]
-    return jsonify(leaderboard), 200
+    body, etag = leaderboard_cache.get()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/admin/users/<string:username>', methods=['DELETE'])
 def admin_remove_user(username):
@@ -139,8 +453,9 @@ def admin_remove_user(username):
     if user_score:
         db.session.delete(user_score)
         db.session.commit()
+        leaderboard_cache.invalidate()
         message_to_send = json.dumps({"type": "leaderboard_update", "message": f"User {username} removed by admin"})
-        sse_message_queue.append(message_to_send)
+        sse_hub.publish(message_to_send, LEADERBOARD_CHANNEL)
         return jsonify({'message': f'User {username} removed successfully'}), 200
     else:
         return jsonify({'error': f'User {username} not found'}), 404
@@ -159,15 +474,17 @@ def admin_edit_user_score(username):
     if user_score:
         user_score.score = new_score_value
         db.session.commit()
+        leaderboard_cache.invalidate()
         message_to_send = json.dumps({"type": "leaderboard_update", "message": f"Score for {username} updated by admin to {new_score_value}"})
-        sse_message_queue.append(message_to_send)
+        sse_hub.publish(message_to_send, LEADERBOARD_CHANNEL)
         return jsonify({'message': f'Score for user {username} updated to {new_score_value}'}), 200
     else:
         new_score = Score(username=username, score=new_score_value)
         db.session.add(new_score)
         db.session.commit()
+        leaderboard_cache.invalidate()
         message_to_send = json.dumps({"type": "leaderboard_update", "message": f"New user {username} with score {new_score_value} added by admin"})
-        sse_message_queue.append(message_to_send)
+        sse_hub.publish(message_to_send, LEADERBOARD_CHANNEL)
         return jsonify({'message': f'New user {username} added with score {new_score_value}'}), 201
 
 @app.route('/api/admin/users/<string:username>/ban', methods=['PUT'])
@@ -176,8 +493,9 @@ def admin_ban_user(username):
     if user_score:
         user_score.banned = True
         db.session.commit()
+        leaderboard_cache.invalidate()
         message_to_send = json.dumps({"type": "leaderboard_update", "message": f"User {username} banned by admin"})
-        sse_message_queue.append(message_to_send)
+        sse_hub.publish(message_to_send, LEADERBOARD_CHANNEL)
         return jsonify({'message': f'User {username} has been banned'}), 200
     else:
         return jsonify({'error': f'User {username} not found'}), 404
@@ -188,13 +506,88 @@ def admin_unban_user(username):
     if user_score:
         user_score.banned = False
         db.session.commit()
+        leaderboard_cache.invalidate()
         message_to_send = json.dumps({"type": "leaderboard_update", "message": f"User {username} unbanned by admin"})
-        sse_message_queue.append(message_to_send)
+        sse_hub.publish(message_to_send, LEADERBOARD_CHANNEL)
         return jsonify({'message': f'User {username} has been unbanned'}), 200
     else:
         return jsonify({'error': f'User {username} not found'}), 404
 
+class ChatIds:
+    # One increasing id sequence shared by every room, so an id names one
+    # message and a client can keep a single cursor across rooms.
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Start from the clock so ids keep increasing across restarts and
+        # clients' cursors stay valid.
+        self.last_id = int(time.time() * 1000)
+
+    def next(self):
+        with self.lock:
+            self.last_id += 1
+            return self.last_id
+
+class ChatHistory:
+    # The most recent chat messages, each with an increasing id and kept
+    # both parsed and as encoded JSON, so GET /api/chat joins stored bytes
+    # instead of decoding and re-encoding every message per request.
+    def __init__(self, size=50, ids=None):
+        self.lock = threading.Lock()
+        self.ids = ids if ids is not None else ChatIds()
+        self.entries = deque(maxlen=size)
+        self.entry_ids = deque(maxlen=size)
+
+    def append(self, message):
+        with self.lock:
+            message_id = self.ids.next()
+            message = {'id': message_id, **message}
+            encoded = json.dumps(message, separators=(',', ':')).encode()
+            self.entries.append((message_id, message, encoded))
+            self.entry_ids.append(message_id)
+        return message, encoded
+
+    def encoded_since(self, message_id=0):
+        with self.lock:
+            # A cursor past the newest id of any room can't be trusted (the
+            # clock went back), so that client gets everything again.
+            if message_id > self.ids.last_id:
+                message_id = 0
+            # Other rooms take ids from the same sequence, so this room's ids
+            # have gaps; find the first newer message by bisection.
+            start = bisect_right(self.entry_ids, message_id)
+            return [encoded for _, _, encoded in islice(self.entries, start, None)]
+
+class ChatRooms:
+    # A ChatHistory per room, made when the room gets its first message.
+    # Past max_rooms, the room that has been quiet longest is dropped,
+    # except for pinned rooms such as the global one.
+    def __init__(self, max_rooms=MAX_CHAT_ROOMS, pinned=(DEFAULT_CHAT_ROOM,)):
+        self.max_rooms = max_rooms
+        self.pinned = set(pinned)
+        self.ids = ChatIds()
+        self.lock = threading.Lock()
+        self.rooms = OrderedDict()
+
+    def history(self, room, create=False):
+        with self.lock:
+            history = self.rooms.get(room)
+            if create:
+                if history is None:
+                    history = self.rooms[room] = ChatHistory(ids=self.ids)
+                self.rooms.move_to_end(room)
+                if len(self.rooms) > self.max_rooms:
+                    oldest = next((name for name in self.rooms if name not in self.pinned), None)
+                    if oldest is not None:
+                        del self.rooms[oldest]
+            return history
+
+def chat_channel(room):
+    return f'chat:{room}'
+
+chat_rooms = ChatRooms()
+
 @app.route('/api/chat', methods=['POST'])
+@rate_limited('chat')
 def send_chat_message():
     data = request.get_json()
     if not data or 'username' not in data or 'message' not in data:
@@ -202,55 +595,90 @@ def send_chat_message():
 
     username = data['username']
     message = data['message']
+    room = data.get('room', DEFAULT_CHAT_ROOM)
+    if not is_acting_user(username):
+        return jsonify({'error': 'Session token belongs to another user.'}), 403
+    if not isinstance(room, str) or not ROOM_NAME_PATTERN.fullmatch(room):
+        return jsonify({'error': 'Invalid room name.'}), 400
+
+    banned_term = chat_filter.find(message)
+    if banned_term:
+        now = datetime.now()
+        standing = UserStanding.query.filter_by(username=username).first()
+        adjust_standing(username, warnings=UserStanding.warnings + 1)
+
+        if standing and standing.kicked_until and standing.kicked_until > now:
+            db.session.commit()
+            return jsonify({'error': f'User {username} is currently banned.'}), 403
 
-    for word in banned_words:
-        if word in message.lower():
-            if username in kick_list and kick_list[username] > datetime.now():
-                return jsonify({'error': f'User {username} is currently banned.'}), 403
-
-            if username in kick_count and kick_count[username] >= 5:
-                user_score = Score.query.filter_by(username=username).first()
-                if user_score:
-                    user_score.banned = True
-                    db.session.commit()
-                return jsonify({'error': f'User {username} has been permanently banned.'}), 403
-
-            kick_list[username] = datetime.now() + timedelta(minutes=15)
-            kick_count[username] = kick_count.get(username, 0) + 1
-            social_scores[username] = 50
-            return jsonify({'error': f'User {username} has been kicked for using inappropriate language.'}), 403
+        if standing and standing.kick_count >= 5:
+            user_score = Score.query.filter_by(username=username).first()
+            if user_score:
+                user_score.banned = True
+            db.session.commit()
+            leaderboard_cache.invalidate()
+            return jsonify({'error': f'User {username} has been permanently banned.', 'term': banned_term}), 403
 
-    chat_message = json.dumps({"type": "chat_message", "username": username, "message": message})
-    
-    chat_message_queue.append(chat_message)
-    if len(chat_message_queue) > 50:
-        chat_message_queue.pop(0)
+        adjust_standing(username, kicked_until=now + timedelta(minutes=15),
+                        kick_count=UserStanding.kick_count + 1, social_score=50)
+        db.session.commit()
+        return jsonify({'error': f'User {username} has been kicked for using inappropriate language.',
+                        'term': banned_term}), 403
 
-    sse_message_queue.append(chat_message)
+    history = chat_rooms.history(room, create=True)
+    _, encoded = history.append({"type": "chat_message", "room": room, "username": username, "message": message})
+    sse_hub.publish(encoded.decode(), chat_channel(room))
     return jsonify({'message': 'Chat message sent successfully'}), 200
 
 @app.route('/api/chat', methods=['GET'])
 def get_chat_messages():
-    messages = [json.loads(msg) for msg in chat_message_queue]
-    return jsonify(messages), 200
+    # ?room=<name> picks the room (global by default); ?since=<id> returns
+    # only the messages after that id. Ids are unique across rooms.
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': 'Since must be an integer message id.'}), 400
+    history = chat_rooms.history(request.args.get('room', DEFAULT_CHAT_ROOM))
+    encoded = history.encoded_since(since) if history else []
+    body = b'[' + b','.join(encoded) + b']'
+    return Response(body, mimetype='application/json')
+
+def parse_last_event_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_channels(value):
+    # ?channels=leaderboard,chat:global limits a stream to those channels;
+    # without it the stream gets everything, as before channels existed.
+    channels = [channel for channel in (value or '').split(',') if channel]
+    return channels[:MAX_STREAM_CHANNELS] or None
 
 @app.route('/stream') 
 def stream():
+    # Browsers send Last-Event-ID when they reconnect; other clients can use the query string.
+    last_event_id = parse_last_event_id(
+        request.headers.get('Last-Event-ID', request.args.get('last_event_id')))
+    subscription = sse_hub.subscribe(last_event_id, channels=parse_channels(request.args.get('channels')))
+
     def event_stream():
-        yield 'data: {{"type": "connection_ack", "message": "SSE connection established"}}\n\n'
-        client_last_sent_index = len(sse_message_queue) 
-        
         try:
+            yield 'data: {"type": "connection_ack", "message": "SSE connection established"}\n\n'
             while True:
-                if len(sse_message_queue) > client_last_sent_index:
-                    for i in range(client_last_sent_index, len(sse_message_queue)):
-                        yield f'data: {sse_message_queue[i]}\n\n'
-                    client_last_sent_index = len(sse_message_queue)
-                
-                time.sleep(1)
+                message = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if message is None:
+                    if subscription.closed:
+                        return
+                    # A comment line keeps proxies from timing out an idle stream.
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(*message)
         except GeneratorExit:
             print(f"Client disconnected from SSE stream.")
-    
+        finally:
+            subscription.close()
+
     response = Response(event_stream(), mimetype="text/event-stream")
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['Connection'] = 'keep-alive'
@@ -274,6 +702,7 @@ def setup_tor_hidden_service():
         return None
 
 @app.route('/api/chat/report', methods=['POST'])
+@rate_limited('chat_report', user_field='reporter')
 def report_user():
     data = request.get_json()
     if not data or 'username' not in data or 'type' not in data:
@@ -283,62 +712,186 @@ def report_user():
     report_type = data['type']
     reporter = data.get('reporter', 'Anonymous')
     reason = data.get('reason', '')
-
-    if username not in social_scores:
-        social_scores[username] = 100
+    if not is_acting_user(reporter):
+        return jsonify({'error': 'Session token belongs to another user.'}), 403
 
     if report_type == 'positive':
-        social_scores[username] += 50
-        report_entry = {
-            'username': username,
-            'reporter': reporter,
-            'reason': reason,
-            'timestamp': time.time()
-        }
-        with open(POS_REPORTS_FILE, 'a') as f:
-            json.dump(report_entry, f)
-            f.write('\n')
+        adjust_standing(username, social_score=UserStanding.social_score + 50)
+        db.session.add(Report(username=username, report_type=report_type, reporter=reporter, reason=reason))
         response_message = {'message': f'Positive feedback recorded for {username}'}
 
-        if social_scores[username] >= 500:
+        social_score = db.session.query(UserStanding.social_score).filter_by(username=username).scalar()
+        if social_score >= 500:
             user_score = Score.query.filter_by(username=username).first()
             if user_score:
                 user_score.bonus_lives = 1
-                db.session.commit()
+        db.session.commit()
 
     elif report_type == 'negative':
-        social_scores[username] -= 25
-        report_entry = {
-            'username': username,
-            'reporter': reporter,
-            'reason': reason,
-            'timestamp': time.time()
-        }
-        with open(NEG_REPORTS_FILE, 'a') as f:
-            json.dump(report_entry, f)
-            f.write('\n')
+        adjust_standing(username, social_score=UserStanding.social_score - 25)
+        db.session.add(Report(username=username, report_type=report_type, reporter=reporter, reason=reason))
         response_message = {'message': f'Negative feedback recorded for {username}'}
 
         user_score = Score.query.filter_by(username=username).first()
         if user_score:
             user_score.bonus_lives = 0
-            db.session.commit()
+        db.session.commit()
 
     else:
         return jsonify({'error': 'Invalid report type. Must be "positive" or "negative".'}), 400
 
-    with open(SOCIAL_SCORE_FILE, 'w') as f:
-        json.dump(social_scores, f)
-
     return jsonify(response_message), 200
 
+def adjust_standing(username, **changes):
+    # Create the user's row if needed, then apply every change in one
+    # UPDATE so concurrent reports can't overwrite each other's increments.
+    db.session.execute(
+        sqlite_insert(UserStanding)
+        .values(username=username, social_score=100, kick_count=0, warnings=0)
+        .on_conflict_do_nothing(index_elements=['username'])
+    )
+    if changes:
+        UserStanding.query.filter_by(username=username).update(changes, synchronize_session=False)
+
+def get_social_scores_map():
+    return {standing.username: standing.social_score for standing in UserStanding.query.all()}
+
+def migrate_social_scores_file():
+    # Social scores used to be rewritten to a JSON file on every report;
+    # load it into UserStanding once, then rename it so this is skipped.
+    if not os.path.exists(SOCIAL_SCORE_FILE):
+        return
+    with open(SOCIAL_SCORE_FILE, 'r') as f:
+        saved_scores = json.load(f)
+    for username, social_score in saved_scores.items():
+        adjust_standing(username, social_score=social_score)
+    db.session.commit()
+    os.replace(SOCIAL_SCORE_FILE, SOCIAL_SCORE_FILE + '.migrated')
+    print(f"Migrated {len(saved_scores)} social scores from {SOCIAL_SCORE_FILE}")
+
 @app.route('/api/social_scores', methods=['GET'])
 def get_social_scores():
-    return jsonify(social_scores), 200
+    return jsonify(get_social_scores_map()), 200
 
 @app.route('/api/admin/social_scores', methods=['GET'])
 def admin_get_social_scores():
-    return jsonify(social_scores), 200
+    return jsonify(get_social_scores_map()), 200
+
+def count_reports(usernames):
+    # One grouped query over the (username, report_type) index.
+    counts = {'positive': {}, 'negative': {}}
+    if not usernames:
+        return counts
+    rows = (db.session.query(Report.username, Report.report_type, db.func.count(Report.id))
+            .filter(Report.username.in_(usernames))
+            .group_by(Report.username, Report.report_type))
+    for username, report_type, count in rows:
+        counts.setdefault(report_type, {})[username] = count
+    return counts
+
+def migrate_report_files():
+    # Reports used to be appended to JSON lines files; load any that are
+    # left into the Report table once, then rename them so this is skipped.
+    for report_file, report_type in [(NEG_REPORTS_FILE, 'negative'), (POS_REPORTS_FILE, 'positive')]:
+        if not os.path.exists(report_file):
+            continue
+        reports = []
+        with open(report_file, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                reports.append(Report(
+                    username=entry['username'],
+                    report_type=report_type,
+                    reporter=entry.get('reporter', 'Anonymous'),
+                    reason=entry.get('reason', ''),
+                    timestamp=entry.get('timestamp', time.time()),
+                ))
+        db.session.add_all(reports)
+        # Reported users get a standing row like a live report would create;
+        # their old social scores are loaded by migrate_social_scores_file.
+        for username in {report.username for report in reports}:
+            adjust_standing(username)
+        db.session.commit()
+        os.replace(report_file, report_file + '.migrated')
+        print(f"Migrated {len(reports)} reports from {report_file}")
+
+def score_rank(score_value):
+    # Players tied on a score share its rank. The count is a range read on
+    # ix_score_banned_score rather than a scan of the table.
+    higher = Score.query.filter(Score.banned == False, Score.score > score_value).count()
+    return higher + 1
+
+def get_rank(player, neighbours):
+    ranked = Score.query.filter(Score.banned == False)
+    total = ranked.count()
+    rank = score_rank(player.score)
+
+    # Neighbours follow the index order, score then id, both descending.
+    above = (ranked.filter(or_(Score.score > player.score,
+                               and_(Score.score == player.score, Score.id > player.id)))
+             .order_by(Score.score.asc(), Score.id.asc()).limit(neighbours).all())
+    below = (ranked.filter(or_(Score.score < player.score,
+                               and_(Score.score == player.score, Score.id < player.id)))
+             .order_by(Score.score.desc(), Score.id.desc()).limit(neighbours).all())
+
+    ranks = {player.score: rank}
+    def entry(score):
+        if score.score not in ranks:
+            ranks[score.score] = score_rank(score.score)
+        return {'username': score.username, 'score': score.score, 'rank': ranks[score.score]}
+
+    return {
+        'username': player.username,
+        'score': player.score,
+        'rank': rank,
+        'total': total,
+        # Share of ranked players scoring the same or lower.
+        'percentile': round((total - rank + 1) / total * 100, 1),
+        'above': [entry(score) for score in reversed(above)],
+        'below': [entry(score) for score in below],
+    }
+
+@app.route('/api/rank', methods=['GET'])
+def get_user_rank():
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'error': 'Username is required.'}), 400
+    try:
+        neighbours = int(request.args.get('neighbours', 2))
+    except ValueError:
+        return jsonify({'error': 'Neighbours must be an integer.'}), 400
+    neighbours = max(0, min(neighbours, RANK_MAX_NEIGHBOURS))
+
+    player = Score.query.filter_by(username=username).first()
+    if not player:
+        return jsonify({'error': 'User has no score.'}), 404
+    if player.banned:
+        return jsonify({'error': 'User is banned.'}), 403
+    return jsonify(get_rank(player, neighbours)), 200
+
+def get_user_modifiers(usernames):
+    # Count reports for everyone asked about, not only users with a
+    # standing row; reports migrated by older servers may have none.
+    standings = {standing.username: standing
+                 for standing in UserStanding.query.filter(UserStanding.username.in_(usernames)).all()}
+    report_counts = count_reports(usernames)
+    negative_reports = report_counts['negative']
+    positive_reports = report_counts['positive']
+    scores = {score.username: score for score in Score.query.filter(Score.username.in_(usernames)).all()}
+
+    modifiers = {}
+    for username in usernames:
+        user_score = scores.get(username)
+        modifiers[username] = {
+            'penalty': negative_reports.get(username, 0) * 10,
+            'bonus': positive_reports.get(username, 0) * 10,
+            'social_score': standings[username].social_score if username in standings else 100,
+            'bonus_lives': user_score.bonus_lives if user_score else 0,
+            'banned': user_score.banned if user_score else False,
+        }
+    return modifiers
 
 @app.route('/api/penalty', methods=['GET'])
 def get_user_penalty():
@@ -346,20 +899,7 @@ def get_user_penalty():
     if not username:
         return jsonify({'error': 'Username is required.'}), 400
 
-    if username not in social_scores:
-        return jsonify({'penalty': 0}), 200
-
-    negative_reports = 0
-    try:
-        with open(NEG_REPORTS_FILE, 'r') as f:
-            for line in f:
-                report = json.loads(line)
-                if report['username'] == username:
-                    negative_reports += 1
-    except FileNotFoundError:
-        pass
-
-    penalty = negative_reports * 10
+    penalty = get_user_modifiers([username])[username]['penalty']
     return jsonify({'penalty': penalty}), 200
 
 @app.route('/api/bonus', methods=['GET'])
@@ -368,46 +908,63 @@ def get_user_bonus():
     if not username:
         return jsonify({'error': 'Username is required.'}), 400
 
-    if username not in social_scores:
-        return jsonify({'bonus': 0}), 200
+    bonus = get_user_modifiers([username])[username]['bonus']
+    return jsonify({'bonus': bonus}), 200
 
-    positive_reports = 0
-    try:
-        with open(POS_REPORTS_FILE, 'r') as f:
-            for line in f:
-                report = json.loads(line)
-                if report['username'] == username:
-                    positive_reports += 1
-    except FileNotFoundError:
-        pass
+@app.route('/api/user_modifiers', methods=['GET'])
+def get_user_modifiers_route():
+    # ?username=name returns one user's modifiers; ?usernames=a,b returns a map of them.
+    username = request.args.get('username')
+    if username:
+        return jsonify(get_user_modifiers([username])[username]), 200
 
-    bonus = positive_reports * 10
-    return jsonify({'bonus': bonus}), 200
+    usernames = [name for name in request.args.get('usernames', '').split(',') if name]
+    if not usernames:
+        return jsonify({'error': 'Username or usernames is required.'}), 400
+    if len(usernames) > 100:
+        return jsonify({'error': 'At most 100 usernames per request.'}), 400
+    return jsonify(get_user_modifiers(list(dict.fromkeys(usernames)))), 200
 
 @app.route('/api/admin/banned_words', methods=['POST'])
 def update_banned_words():
     data = request.get_json()
-    if not data or 'words' not in data:
+    if not data or not isinstance(data.get('words'), list) or not all(isinstance(word, str) for word in data['words']):
         return jsonify({'error': 'Invalid data. Words are required.'}), 400
-    global banned_words
-    banned_words = data['words']
-    return jsonify({'message': 'Banned words updated successfully.'}), 200
+    # Optional "whole_words" and "normalize" flags change how terms match;
+    # left out, the current settings are kept.
+    chat_filter.update(data['words'], data.get('whole_words'), data.get('normalize'))
+    return jsonify({'message': 'Banned words updated successfully.', 'count': len(chat_filter.terms)}), 200
 
 @app.route('/api/admin/kick_list', methods=['GET'])
 def get_kick_list():
-    active_kicks = {user: time.isoformat() for user, time in kick_list.items() if time > datetime.now()}  # Fixed time serialization
+    kicked = UserStanding.query.filter(UserStanding.kicked_until > datetime.now()).all()
+    active_kicks = {standing.username: standing.kicked_until.isoformat() for standing in kicked}
     return jsonify(active_kicks), 200
 
 @app.route('/api/admin/kick_count', methods=['GET'])
 def get_kick_count():
-    return jsonify(kick_count), 200
+    kicked = UserStanding.query.filter(UserStanding.kick_count > 0).all()
+    return jsonify({standing.username: standing.kick_count for standing in kicked}), 200
 
 @app.route('/api/multiplayer_rankings', methods=['GET'])
 def get_multiplayer_rankings():
-    rankings = MultiplayerRanking.query.order_by(MultiplayerRanking.wins.desc()).all()
+    try:
+        limit = int(request.args.get('limit', RANKINGS_DEFAULT_LIMIT))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'error': 'Limit and offset must be integers.'}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({'error': 'Limit must be positive and offset non-negative.'}), 400
+    limit = min(limit, RANKINGS_MAX_LIMIT)
+
+    # Ordering by id as well keeps pages stable when players are tied on wins.
+    rankings = (MultiplayerRanking.query
+                .order_by(MultiplayerRanking.wins.desc(), MultiplayerRanking.id.desc())
+                .limit(limit).offset(offset).all())
     return jsonify([{"username": r.username, "wins": r.wins, "losses": r.losses} for r in rankings]), 200
 
 @app.route('/api/multiplayer_rankings/update', methods=['POST'])
+@rate_limited('multiplayer_rankings')
 def update_multiplayer_rankings():
     data = request.get_json()
     if not data or 'username' not in data or 'result' not in data:
@@ -415,10 +972,12 @@ def update_multiplayer_rankings():
 
     username = data['username']
     result = data['result']  # "win" or "loss"
+    if not is_acting_user(username):
+        return jsonify({'error': 'Session token belongs to another user.'}), 403
 
     ranking = MultiplayerRanking.query.filter_by(username=username).first()
     if not ranking:
-        ranking = MultiplayerRanking(username=username)
+        ranking = MultiplayerRanking(username=username, wins=0, losses=0)
         db.session.add(ranking)
 
     if result == "win":
@@ -431,14 +990,22 @@ def update_multiplayer_rankings():
     db.session.commit()
     return jsonify({'message': 'Multiplayer ranking updated successfully.'}), 200
 
-if __name__ == '__main__':
+def ensure_indexes():
+    # create_all() skips tables that already exist, so databases made before
+    # an index was added to a model get it here.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def init_database():
     with app.app_context():
         db.create_all()
+        ensure_indexes()
+        migrate_report_files()
+        migrate_social_scores_file()
 
-    for report_file in [NEG_REPORTS_FILE, POS_REPORTS_FILE]:
-        if not os.path.exists(report_file):
-            with open(report_file, 'w') as f:
-                pass
+if __name__ == '__main__':
+    init_database()
 
     onion_address = setup_tor_hidden_service()
     if onion_address:
@@ -0,0 +1,83 @@
+# Async entry point for the leaderboard server.
+#
+# /stream is served natively on the event loop, so an idle spectator costs
+# a coroutine instead of a thread. Every other route is the Flask app from
+# leaderboard_server, run on a bounded worker pool, so its database access
+# stays off the event loop.
+#
+#   python leaderboard_server_asgi.py --host 0.0.0.0 --port 5555 --workers 32
+
+import argparse
+import contextlib
+
+import leaderboard_server
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.routing import Mount, Route
+
+from broadcast_hub import AsyncSubscription, format_sse
+from leaderboard_server import (SSE_KEEPALIVE_SECONDS, app as flask_app, init_database,
+                                parse_channels, parse_last_event_id, sse_hub)
+
+DEFAULT_WSGI_WORKERS = 32
+
+
+async def stream(request: Request):
+    last_event_id = parse_last_event_id(
+        request.headers.get('last-event-id', request.query_params.get('last_event_id')))
+    subscription = sse_hub.subscribe(last_event_id, subscription_class=AsyncSubscription,
+                                     channels=parse_channels(request.query_params.get('channels')))
+
+    async def event_stream():
+        try:
+            yield 'data: {"type": "connection_ack", "message": "SSE connection established"}\n\n'
+            while True:
+                message = await subscription.get_async(timeout=SSE_KEEPALIVE_SECONDS)
+                if message is None:
+                    if subscription.closed:
+                        return
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(*message)
+        finally:
+            subscription.close()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(event_stream(), media_type='text/event-stream', headers=headers)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Create tables and run migrations before serving, however the app was
+    # started: from __main__ below or as `uvicorn leaderboard_server_asgi:app`.
+    await run_in_threadpool(init_database)
+    yield
+
+
+def create_app(workers=DEFAULT_WSGI_WORKERS):
+    return Starlette(routes=[
+        Route('/stream', stream),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=workers)),
+    ], lifespan=lifespan)
+
+
+app = create_app()
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the leaderboard server on an ASGI stack.")
+    parser.add_argument('--host', default='192.168.254.14')
+    parser.add_argument('--port', type=int, default=5555)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WSGI_WORKERS,
+                        help="threads serving the Flask API routes")
+    parser.add_argument('--hash-workers', type=int, default=leaderboard_server.PASSWORD_HASH_WORKERS,
+                        help="processes hashing passwords; 0 hashes on the request threads")
+    args = parser.parse_args()
+
+    leaderboard_server.PASSWORD_HASH_WORKERS = args.hash_workers
+    uvicorn.run(create_app(args.workers), host=args.host, port=args.port)
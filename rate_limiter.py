@@ -0,0 +1,117 @@
+import math
+import sqlite3
+import threading
+import time
+
+
+class RateLimit:
+    """A token bucket size and how fast it refills."""
+
+    def __init__(self, capacity, per_seconds):
+        # capacity requests at once, refilling one token every per_seconds / capacity.
+        self.capacity = capacity
+        self.refill_rate = capacity / per_seconds
+
+    def take(self, tokens, updated, now, cost):
+        # Return the bucket's new (tokens, updated) and how long to wait
+        # before retrying, which is 0 when the request is allowed.
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+        if tokens >= cost:
+            return tokens - cost, now, 0.0
+        return tokens, now, (cost - tokens) / self.refill_rate
+
+
+class MemoryBuckets:
+    """Buckets kept in this process only."""
+
+    def __init__(self, max_buckets=100000):
+        self.max_buckets = max_buckets
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, limit, now, cost):
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (limit.capacity, now))
+            tokens, updated, retry_after = limit.take(tokens, updated, now, cost)
+            self.buckets[key] = (tokens, updated)
+            if len(self.buckets) > self.max_buckets:
+                self._drop_idle(now)
+            return retry_after
+
+    def _drop_idle(self, now):
+        # Drop buckets idle for an hour, long enough for any of the server's
+        # limits to refill; a full bucket and a missing one behave the same.
+        # If that frees nothing, drop the oldest half so memory stays bounded
+        # under a flood of keys.
+        idle = [key for key, (_, updated) in self.buckets.items() if now - updated > 3600]
+        if not idle:
+            by_age = sorted(self.buckets, key=lambda key: self.buckets[key][1])
+            idle = by_age[:len(by_age) // 2]
+        for key in idle:
+            del self.buckets[key]
+
+
+class SQLiteBuckets:
+    """Buckets stored in a SQLite file, so they survive restarts and are
+    shared by every server process using the same file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS rate_limit_bucket '
+                               '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self.local.connection = connection
+        return connection
+
+    def take(self, key, limit, now, cost):
+        connection = self._connection()
+        # IMMEDIATE takes the write lock up front, so two processes can't
+        # both read the same token count and spend it twice.
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?',
+                                     (key,)).fetchone()
+            tokens, updated = row if row else (limit.capacity, now)
+            tokens, updated, retry_after = limit.take(tokens, updated, now, cost)
+            connection.execute('INSERT INTO rate_limit_bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                               'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                               (key, tokens, updated))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return retry_after
+
+
+class RateLimiter:
+    """Named token bucket limits, with one bucket per name and key.
+
+    limits maps a name, such as a route, to a RateLimit; the key is who is
+    being limited, such as a username or IP address. With db_path the
+    buckets are kept in SQLite instead of memory.
+    """
+
+    def __init__(self, limits, db_path=None):
+        self.limits = limits
+        self.buckets = SQLiteBuckets(db_path) if db_path else MemoryBuckets()
+
+    def hit(self, name, key, cost=1):
+        # Take cost tokens from key's bucket. Returns 0 if the request may go
+        # ahead, otherwise the seconds to wait before it would be allowed.
+        limit = self.limits.get(name)
+        if limit is None:
+            return 0.0
+        return self.buckets.take(f'{name}:{key}', limit, time.time(), cost)
+
+
+def retry_after_header(seconds):
+    # Retry-After takes whole seconds; round up so a client that waits
+    # exactly that long finds a token.
+    return str(max(1, math.ceil(seconds)))